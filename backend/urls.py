@@ -30,6 +30,7 @@ urlpatterns = [
     path('api/v1/', include('recreated_background.urls')),                          # 'recreated_background' 앱의 URL을 포함
     path('api/v1/', include('image_resizing.urls')),
     path('api/v1/', include('video.urls')),                                # 'image_resizing' 앱의 URL을 포함
+    path('api/v1/', include('core.urls')),                                          # 'core' 앱의 URL을 포함
     path('', include('django_prometheus.urls')),                                    # 'django_prometheus' 앱의 URL을 포함
     path('api/v1/texttovideo/', include('texttovideo.urls')),
 ]
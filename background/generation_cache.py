@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+import time
+from django.conf import settings
+from django_redis import get_redis_connection
+from prometheus_client import Counter
+from .models import Background
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 같은 입력(원본 이미지 + 생성 옵션)에 대한 Draph 생성 결과 캐시
+# 값은 결과 이미지 URL이며 S3 객체는 캐시에서 만든 Background 행들이 함께 참조한다
+# 항목은 TTL로 만료되고, 최근 사용 순서를 기록한 sorted set으로 최대 개수를 넘으면 오래된 것부터 지운다
+
+KEY_PREFIX = 'background_generation:'
+INDEX_KEY = 'background_generation_index'
+URL_FIELDS = ['image_url', 'thumbnail_url', 'preview_url']
+
+generation_cache_requests_total = Counter('background_generation_cache_requests_total', '배경 생성 결과 캐시 조회 수', ['result'])
+
+
+def _normalize(value):
+    # 대소문자/앞뒤 공백/키 순서만 다른 옵션은 같은 입력으로 취급
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def fingerprint(image, gen_type, output_w, output_h, concept_option, output=None):
+    """
+    원본 이미지 내용과 생성 옵션으로 캐시 키로 쓸 지문을 만듭니다.
+    (내용 해시가 없는 예전 이미지는 uuid 기반이라 바뀌지 않는 S3 URL을 사용)
+    """
+    source = image.content_hash or image.image_url
+    payload = json.dumps({
+        'source': source,
+        'gen_type': gen_type,
+        'output_w': int(output_w),
+        'output_h': int(output_h),
+        'concept_option': _normalize(concept_option or {}),
+        'output': output,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get(fp):
+    """
+    캐시된 결과 URL({'image_url', 'thumbnail_url', 'preview_url'})을 반환합니다.
+    결과 객체를 참조하던 행이 모두 삭제되어 S3 객체가 지워졌을 수 있으면 무효로 처리합니다.
+    """
+    redis_client = get_redis_connection('default')
+    raw = redis_client.get(f"{KEY_PREFIX}{fp}")
+    if raw is None:
+        generation_cache_requests_total.labels(result='miss').inc()
+        return None
+    urls = json.loads(raw)
+    if not Background.objects.filter(image_url=urls['image_url']).exists():
+        invalidate(fp)
+        generation_cache_requests_total.labels(result='stale').inc()
+        return None
+    redis_client.zadd(INDEX_KEY, {fp: time.time()})
+    generation_cache_requests_total.labels(result='hit').inc()
+    return urls
+
+
+def put(fp, urls):
+    redis_client = get_redis_connection('default')
+    pipe = redis_client.pipeline()
+    pipe.set(f"{KEY_PREFIX}{fp}", json.dumps({field: urls.get(field) for field in URL_FIELDS}),
+             ex=settings.GENERATION_CACHE_TTL)
+    pipe.zadd(INDEX_KEY, {fp: time.time()})
+    pipe.zcard(INDEX_KEY)
+    size = pipe.execute()[-1]
+
+    overflow = size - settings.GENERATION_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        # 가장 오래 사용되지 않은 항목부터 제거 (TTL로 이미 만료된 키도 인덱스에서 함께 정리됨)
+        evicted = [member.decode() for member, _ in redis_client.zpopmin(INDEX_KEY, overflow)]
+        redis_client.delete(*[f"{KEY_PREFIX}{member}" for member in evicted])
+
+
+def invalidate(fp):
+    redis_client = get_redis_connection('default')
+    pipe = redis_client.pipeline()
+    pipe.delete(f"{KEY_PREFIX}{fp}")
+    pipe.zrem(INDEX_KEY, fp)
+    pipe.execute()
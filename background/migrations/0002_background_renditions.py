@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('background', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='background',
+            name='thumbnail_url',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='background',
+            name='preview_url',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('background', '0003_background_output_format'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='background',
+            name='image_url',
+            field=models.CharField(blank=True, db_index=True, max_length=500, null=True),
+        ),
+    ]
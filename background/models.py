@@ -8,7 +8,10 @@ class Background(models.Model):
     concept_option = models.TextField(default='default_concept')  # 기본값 설정
     output_h = models.IntegerField()
     output_w = models.IntegerField()
-    image_url = models.CharField(max_length=500, null=True, blank=True)  # null 값을 허용
+    image_url = models.CharField(max_length=500, null=True, blank=True, db_index=True)  # null 값을 허용, 생성 캐시의 URL 조회용 인덱스
+    thumbnail_url = models.CharField(max_length=500, null=True, blank=True)  # 썸네일 URL
+    preview_url = models.CharField(max_length=500, null=True, blank=True)  # WebP 미리보기 URL
+    output_format = models.CharField(max_length=10, default='png')  # 결과 이미지 인코딩 포맷 (png, webp, jpeg)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
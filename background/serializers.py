@@ -4,6 +4,6 @@ class BackgroundSerializer(serializers.ModelSerializer):
     class Meta:
         model = Background
         fields = [
-            'id', 'user', 'image_url', 'output_h', 'output_w'
+            'id', 'user', 'image_url', 'thumbnail_url', 'preview_url', 'output_h', 'output_w', 'output_format'
         ]
-        read_only_fields = ['id', 'image_url']
+        read_only_fields = ['id', 'image_url', 'thumbnail_url', 'preview_url', 'output_format']
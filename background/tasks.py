@@ -1,13 +1,15 @@
 # background/tasks.py
 from celery import shared_task
-from .models import Background, Image, User
-import requests
+from .models import Background, Image
 import io
+import uuid
 import base64
-import boto3
 from PIL import Image as PILImage
 import json
 from django.conf import settings
+from image.renditions import upload_renditions
+from core import draph, encoding, jobs, resilience, storage, source_cache
+from . import generation_cache
 import logging
 import redis
 
@@ -16,53 +18,188 @@ logger = logging.getLogger(__name__)
 # Redis 클라이언트 설정
 redis_client = redis.StrictRedis(host='redis', port=6379, db=0)
 
-@shared_task
-def generate_background_task(background_id, user_id, image_id, gen_type, output_w, output_h, concept_option,
-                             unique_filename):
+def draph_data(gen_type, output_w, output_h, concept_option):
+    return {
+        "username": settings.DRAPHART_USER_NAME,
+        "gen_type": gen_type,
+        "multiblob_sod": settings.DRAPHART_MULTIBLOD_SOD,
+        "output_w": output_w,
+        "output_h": output_h,
+        "bg_color_hex_code": settings.DRAPHART_BD_COLOR_HEX_CODE,
+        'concept_option': json.dumps(concept_option),
+    }
+
+
+def generate_output(image, data, policy):
+    """
+    원본 이미지를 Draph에 보내고 결과(base64)를 출력 정책의 포맷으로 인코딩해서 반환합니다.
+    """
+    image_file = io.BytesIO(source_cache.fetch(image.image_url))
+    file_name, file_type = image.source_file_info()
+    files = {'image': (file_name, image_file, file_type)}
+
+    response = draph.generate(data, files)
+    if response.status_code != 200:
+        raise draph.DraphError(f"AI 이미지 생성 실패: {response.text}", status_code=response.status_code)
+
+    image_data = base64.b64decode(response.content)
+    with PILImage.open(io.BytesIO(image_data)) as pil_image:
+        return encoding.encode(pil_image, policy)
+
+
+def output_filename(policy):
+    return f"{uuid.uuid4()}.{encoding.extension(policy)}"
+
+
+def upload_output(output_data, unique_filename, policy):
+    # 결과 이미지와 썸네일/WebP 미리보기를 업로드하고 URL을 반환
+    s3_url = storage.upload_fileobj(io.BytesIO(output_data), unique_filename, encoding.content_type(policy))
+    rendition_urls = upload_renditions(output_data, unique_filename)
+    return {
+        'image_url': s3_url,
+        'thumbnail_url': rendition_urls.get('thumbnail_url'),
+        'preview_url': rendition_urls.get('preview_url'),
+    }
+
+
+@shared_task(bind=True)
+def generate_background_task(self, background_id, user_id, image_id, gen_type, output_w, output_h, concept_option,
+                             unique_filename, fingerprint=None, output=None, job_id=None):
+    jobs.start(job_id)
     try:
-        user = User.objects.get(id=user_id)
+        policy = output or encoding.get_policy('background')
         image = Image.objects.get(id=image_id)
-        image_url = image.image_url
-        image_response = requests.get(image_url)
-        image_response.raise_for_status()
-        image_file = io.BytesIO(image_response.content)
-
-        url = "https://api.draph.art/v1/generate/"
-        headers = {'Authorization': f'Bearer {settings.DRAPHART_API_KEY}'}
-        files = {'image': ('image.jpg', image_file, 'image/jpeg')}
-        data = {
-            "username": settings.DRAPHART_USER_NAME,
-            "gen_type": gen_type,
-            "multiblob_sod": settings.DRAPHART_MULTIBLOD_SOD,
-            "output_w": output_w,
-            "output_h": output_h,
-            "bg_color_hex_code": settings.DRAPHART_BD_COLOR_HEX_CODE,
-            'concept_option': json.dumps(concept_option),
-        }
-
-        response = requests.post(url, headers=headers, data=data, files=files)
-        response_data = response.content
-        image_data = base64.b64decode(response_data)
-        image_bytes = io.BytesIO(image_data)
-        pil_image = PILImage.open(image_bytes)
-        pil_image = pil_image.convert('RGB')
-        png_image_bytes = io.BytesIO()
-        pil_image.save(png_image_bytes, format='PNG')
-        png_image_bytes.seek(0)
-
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        s3.upload_fileobj(png_image_bytes, settings.AWS_STORAGE_BUCKET_NAME, unique_filename,
-                          ExtraArgs={'ContentType': 'image/png'})
-        s3_url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{unique_filename}"
+        output_data = generate_output(image, draph_data(gen_type, output_w, output_h, concept_option), policy)
+        jobs.update(job_id, progress=80)
+        urls = upload_output(output_data, unique_filename, policy)
 
         # Background 모델 업데이트
         background_instance = Background.objects.get(id=background_id)
-        background_instance.image_url = s3_url
+        background_instance.image_url = urls['image_url']
+        background_instance.thumbnail_url = urls['thumbnail_url']
+        background_instance.preview_url = urls['preview_url']
         background_instance.save()
 
+        # 같은 입력의 다음 요청은 캐시된 결과를 재사용
+        if fingerprint:
+            generation_cache.put(fingerprint, urls)
+
         redis_client.delete(f'background_image_url_{image_id}')
 
-        return {"background_id": background_instance.id, "image_url": s3_url}
+        result = {"background_id": background_instance.id, "image_url": urls['image_url']}
+        jobs.complete(job_id, result)
+        return result
     except Exception as e:
+        if isinstance(e, draph.DraphError) and e.retryable:
+            resilience.retry_task(self, 'draph', e)
         logger.error("Error in generate_background_task: %s", e)
+        jobs.fail(job_id, e)
         return {"error": str(e)}
+
+
+@shared_task(bind=True)
+def regenerate_background_task(self, background_id, output=None, job_id=None):
+    """
+    기존 배경을 같은 옵션으로 다시 생성해서 이미지를 교체합니다.
+    """
+    jobs.start(job_id)
+    try:
+        background = Background.objects.select_related('image').get(id=background_id)
+        policy = output or encoding.get_policy('background', background.output_format)
+        try:
+            concept_option = json.loads(background.concept_option)
+        except json.JSONDecodeError as e:
+            logger.error("JSONDecodeError: %s", e)
+            concept_option = {}  # 기본값 설정
+
+        data = draph_data(background.gen_type, background.output_w, background.output_h, concept_option)
+        output_data = generate_output(background.image, data, policy)
+        jobs.update(job_id, progress=80)
+        urls = upload_output(output_data, output_filename(policy), policy)
+
+        # 이전 결과는 생성 결과 캐시로 다른 배경과 공유 중이 아니면 삭제 대기열에 넣음
+        old_urls = [background.image_url, background.thumbnail_url, background.preview_url]
+        shared = background.image_url and Background.objects.filter(image_url=background.image_url).exclude(id=background.id).exists()
+
+        background.image_url = urls['image_url']
+        background.thumbnail_url = urls['thumbnail_url']
+        background.preview_url = urls['preview_url']
+        background.output_format = policy['format']
+        background.recreated = True
+        background.save()
+
+        if not shared:
+            storage.enqueue_delete(old_urls)
+
+        result = {"background_id": background.id, "image_url": urls['image_url']}
+        jobs.complete(job_id, result)
+        return result
+    except Exception as e:
+        if isinstance(e, draph.DraphError) and e.retryable:
+            resilience.retry_task(self, 'draph', e)
+        logger.error("Error in regenerate_background_task: %s", e)
+        jobs.fail(job_id, e)
+        return {"error": str(e)}
+
+
+@shared_task(bind=True)
+def generate_background_variant_task(self, image_id, gen_type, output_w, output_h, concept_option, output=None,
+                                     job_id=None, job_total=1):
+    """
+    num_results 중 하나의 결과를 생성/업로드하고 URL을 반환합니다. (실패하면 None)
+    """
+    try:
+        image = Image.objects.get(id=image_id)
+        # 결과 여러 개는 작업 여러 개로 나눠서 동시에 요청하므로 각 요청은 1개씩 생성
+        variant_option = dict(concept_option, num_results=1)
+        policy = output or encoding.get_policy('background')
+        output_data = generate_output(image, draph_data(gen_type, output_w, output_h, variant_option), policy)
+        urls = upload_output(output_data, output_filename(policy), policy)
+    except Exception as e:
+        if isinstance(e, draph.DraphError) and e.retryable:
+            resilience.retry_task(self, 'draph', e)
+        logger.error("Error in generate_background_variant_task: %s", e)
+        jobs.advance(job_id, job_total, failed=True, finish=False)
+        return None
+    # 작업 완료 처리는 chord 콜백에서 함
+    jobs.advance(job_id, job_total, finish=False)
+    return urls
+
+
+@shared_task
+def create_background_variants_task(results, user_id, image_id, gen_type, output_w, output_h, concept_option,
+                                    output_format='png', job_id=None):
+    """
+    chord 콜백: 성공한 결과들로 Background 행을 한 번에 만들고 ID 목록을 반환합니다.
+    """
+    requested = len(results)
+    results = [urls for urls in results if urls]
+    if not results:
+        jobs.fail(job_id, "모든 결과 생성에 실패했습니다.")
+        return {"error": "모든 결과 생성에 실패했습니다."}
+
+    backgrounds = [
+        Background(
+            user_id=user_id,
+            image_id=image_id,
+            gen_type=gen_type,
+            concept_option=json.dumps(concept_option),
+            output_w=output_w,
+            output_h=output_h,
+            output_format=output_format,
+            **urls
+        )
+        for urls in results
+    ]
+    Background.objects.bulk_create(backgrounds)
+    # MySQL은 bulk_create 후 PK를 돌려주지 않으므로 고유한 결과 URL로 다시 조회
+    background_ids = list(
+        Background.objects.filter(image_url__in=[urls['image_url'] for urls in results])
+        .order_by('id').values_list('id', flat=True)
+    )
+
+    redis_client.delete(f'background_image_url_{image_id}')
+
+    result = {"background_ids": background_ids, "failed": requested - len(results)}
+    jobs.complete(job_id, result)
+    return result
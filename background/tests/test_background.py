@@ -61,8 +61,8 @@ class TestBackgroundAPI:
         )
         update_background_url = reverse('background-manage', kwargs={'background_id': background.id})
         response = self.client.put(update_background_url)
-        assert response.status_code == status.HTTP_200_OK
-        assert 'image_url' in response.data
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert 'task_id' in response.data
 
     def test_delete_background(self): #배경 이미지 삭제 테스트
         background = Background.objects.create(
@@ -0,0 +1,119 @@
+import itertools
+from types import SimpleNamespace
+from unittest import mock
+import pytest
+from user.models import User
+from image.models import Image
+from background.models import Background
+from background import generation_cache
+
+
+class FakeRedis:
+    # generation_cache가 쓰는 명령만 흉내 내는 메모리 Redis (TTL은 무시)
+
+    def __init__(self):
+        self.values = {}
+        self.index = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def zadd(self, key, mapping):
+        self.index.update(mapping)
+
+    def zrem(self, key, member):
+        self.index.pop(member, None)
+
+    def zcard(self, key):
+        return len(self.index)
+
+    def zpopmin(self, key, count):
+        members = sorted(self.index.items(), key=lambda item: item[1])[:count]
+        for member, _ in members:
+            del self.index[member]
+        return [(member.encode(), score) for member, score in members]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class TestGenerationFingerprint:
+    def setup_method(self):
+        self.image = SimpleNamespace(content_hash='a' * 64, image_url='https://bucket.s3.ap-northeast-2.amazonaws.com/a.png')
+
+    def test_same_input_same_fingerprint(self): #옵션의 키 순서/대소문자/공백이 달라도 같은 지문
+        first = generation_cache.fingerprint(self.image, 'concept', 1000, '1000', {'category': 'Food', 'theme': ' modern '})
+        second = generation_cache.fingerprint(self.image, 'concept', '1000', 1000, {'theme': 'modern', 'category': 'food'})
+        assert first == second
+
+    def test_different_input_different_fingerprint(self): #출력 크기나 원본이 다르면 다른 지문
+        base = generation_cache.fingerprint(self.image, 'concept', 1000, 1000, {'category': 'food'})
+        assert base != generation_cache.fingerprint(self.image, 'concept', 1000, 800, {'category': 'food'})
+        other_image = SimpleNamespace(content_hash='b' * 64, image_url=self.image.image_url)
+        assert base != generation_cache.fingerprint(other_image, 'concept', 1000, 1000, {'category': 'food'})
+
+
+URLS = {
+    'image_url': 'https://bucket.s3.ap-northeast-2.amazonaws.com/result.png',
+    'thumbnail_url': 'https://bucket.s3.ap-northeast-2.amazonaws.com/result_thumbnail.jpg',
+    'preview_url': 'https://bucket.s3.ap-northeast-2.amazonaws.com/result_preview.webp',
+}
+
+
+@pytest.fixture
+def redis_client():
+    client = FakeRedis()
+    with mock.patch('background.generation_cache.get_redis_connection', return_value=client):
+        yield client
+
+
+def create_background(image_url):
+    user = User.objects.create(nickname='testuser')
+    image = Image.objects.create(user=user, image_url='https://bucket.s3.ap-northeast-2.amazonaws.com/a.png')
+    return Background.objects.create(user=user, image=image, output_w=1000, output_h=1000, image_url=image_url)
+
+
+@pytest.mark.django_db
+def test_put_get_round_trip(redis_client): #저장한 결과 URL을 그대로 돌려줌
+    create_background(URLS['image_url'])
+    generation_cache.put('fp', URLS)
+    assert generation_cache.get('fp') == URLS
+    assert generation_cache.get('other') is None
+
+
+@pytest.mark.django_db
+def test_get_skips_stale_entry(redis_client): #결과를 참조하는 배경이 없으면 무효로 처리하고 항목을 지움
+    generation_cache.put('fp', URLS)
+    assert generation_cache.get('fp') is None
+    assert f"{generation_cache.KEY_PREFIX}fp" not in redis_client.values
+    assert 'fp' not in redis_client.index
+
+
+def test_put_evicts_least_recently_used(redis_client, settings): #최대 개수를 넘으면 가장 오래 사용되지 않은 항목부터 제거
+    settings.GENERATION_CACHE_MAX_ENTRIES = 2
+    with mock.patch('background.generation_cache.time.time', side_effect=itertools.count()):
+        for fp in ('first', 'second', 'third'):
+            generation_cache.put(fp, URLS)
+    assert set(redis_client.index) == {'second', 'third'}
+    assert f"{generation_cache.KEY_PREFIX}first" not in redis_client.values
+    assert f"{generation_cache.KEY_PREFIX}third" in redis_client.values
@@ -6,59 +6,22 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .models import Background, Image, User
 from .serializers import BackgroundSerializer
-import requests
-import io
 import uuid
-import base64
-import boto3
-from PIL import Image as PILImage
 import json
 import logging
-from django.conf import settings
-from .tasks import generate_background_task
-import re
-import environ
-
-# 환경 변수 로드
-env = environ.Env()
-environ.Env.read_env()
+from django.db import transaction
+from celery import chord
+from .tasks import (generate_background_task, regenerate_background_task, generate_background_variant_task,
+                    create_background_variants_task)
+from core import encoding, jobs, storage, translation
+from . import generation_cache
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-# OpenAI API 키 설정
-openai_api_key = env("OPENAI_API_KEY")
-
 # 허용된 이미지 생성 유형
 GEN_TYPES = ['remove_bg', 'color_bg', 'simple', 'concept']
-
-def is_korean(text):
-    # 간단하게 한국어 문자가 포함되어 있는지 확인
-    return bool(re.search('[\u3131-\u3163\uac00-\ud7a3]', text))
-
-def translate_text(text, source_language='ko', target_language='en'):
-    try:
-        headers = {
-            'Authorization': f'Bearer {openai_api_key}',
-            'Content-Type': 'application/json'
-        }
-        data = {
-            "model": "gpt-4",
-            "messages": [
-                {"role": "system", "content": f"Translate the following text from {source_language} to {target_language}."},
-                {"role": "user", "content": text}
-            ],
-            "max_tokens": 100
-        }
-
-        response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, json=data)
-        response.raise_for_status()
-        response_json = response.json()
-        translation = response_json['choices'][0]['message']['content'].strip().strip('\"')
-        return translation
-    except Exception as e:
-        logger.error("Error translating text: %s", e)
-        return text
+MAX_NUM_RESULTS = 4
 
 @swagger_auto_schema(method='post',
     request_body=openapi.Schema(
@@ -74,11 +37,15 @@ def translate_text(text, source_language='ko', target_language='en'):
                 'theme': openapi.Schema(type=openapi.TYPE_STRING, description='Theme'),
                 'num_results': openapi.Schema(type=openapi.TYPE_INTEGER, description='Number of Results', minimum=1, maximum=4)
             }),
+            'fresh': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='캐시된 결과를 쓰지 않고 새로 생성', default=False),
+            'output_format': openapi.Schema(type=openapi.TYPE_STRING, description='결과 이미지 포맷 (기본값은 서버 설정)', enum=list(encoding.FORMATS)),
+            'output_quality': openapi.Schema(type=openapi.TYPE_INTEGER, description='WebP/JPEG 품질', minimum=1, maximum=100),
         },
         required=['user_id', 'image_id', 'gen_type']
     ),
     responses={
-        201: openapi.Response('AI 이미지 생성 성공', BackgroundSerializer(many=True)),
+        201: openapi.Response('캐시된 생성 결과 반환', BackgroundSerializer),
+        202: 'AI 이미지 생성 요청 접수 (job_id로 진행 상태 조회, num_results가 1이면 background_id도 반환)',
         400: 'Bad Request',
         500: 'Internal Server Error'
     }
@@ -109,17 +76,59 @@ def backgrounds_view(request):
     except Image.DoesNotExist:
         return Response({"error": "이미지 없음"}, status=status.HTTP_404_NOT_FOUND)
 
-    # 사용자의 입력을 영어로 번역
-    category = concept_option.get('category')
-    theme = concept_option.get('theme')
-    if category and is_korean(category):
-        category_en = translate_text(category)
-        concept_option['category'] = category_en
-    if theme and is_korean(theme):
-        theme_en = translate_text(theme)
-        concept_option['theme'] = theme_en
+    if not image.image_url:
+        return Response({"error": "이미지 업로드가 아직 완료되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        output = encoding.get_policy('background', request.data.get('output_format'), request.data.get('output_quality'))
+    except encoding.OutputFormatError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    unique_filename = f"{uuid.uuid4()}.png"
+    try:
+        num_results = int((concept_option or {}).get('num_results', 1))
+    except (TypeError, ValueError):
+        num_results = 0
+    if not 1 <= num_results <= MAX_NUM_RESULTS:
+        return Response({"error": f"num_results는 1~{MAX_NUM_RESULTS} 사이여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 사용자의 입력을 영어로 번역 (용어표에 있는 카테고리/테마는 네트워크 없이 번역)
+    concept_option = translation.translate_concept_option(concept_option)
+
+    if num_results > 1:
+        # 여러 결과는 동시에 생성하고, 모두 끝나면 한 번에 Background 행을 만듦 (하나의 작업으로 조회)
+        job_id = jobs.create('background_generation', image_id=image.id, num_results=num_results)
+        result = chord([
+            generate_background_variant_task.s(image.id, gen_type, output_w, output_h, concept_option, output=output,
+                                               job_id=job_id, job_total=num_results)
+            for _ in range(num_results)
+        ])(create_background_variants_task.s(user.id, image.id, gen_type, output_w, output_h, concept_option,
+                                             output_format=output['format'], job_id=job_id))
+        return Response({
+            "job_id": job_id,
+            "task_id": result.id,
+            "num_results": num_results
+        }, status=status.HTTP_202_ACCEPTED)
+
+    # 같은 입력으로 이미 생성한 결과가 있으면 Draph를 다시 호출하지 않고 바로 반환
+    # (사용자가 새 결과를 원하면 설정 또는 요청의 fresh 값으로 캐시를 건너뜀)
+    fingerprint = generation_cache.fingerprint(image, gen_type, output_w, output_h, concept_option, output)
+    fresh = request.data.get('fresh') in (True, 'true', '1', 1)
+    if user.reuse_generations and not fresh:
+        cached_urls = generation_cache.get(fingerprint)
+        if cached_urls:
+            background_instance = Background.objects.create(
+                user=user,
+                image=image,
+                gen_type=gen_type,
+                concept_option=json.dumps(concept_option),
+                output_w=output_w,
+                output_h=output_h,
+                output_format=output['format'],
+                **cached_urls
+            )
+            return Response(BackgroundSerializer(background_instance).data, status=status.HTTP_201_CREATED)
+
+    unique_filename = f"{uuid.uuid4()}.{encoding.extension(output)}"
     background_instance = Background.objects.create(
         user=user,
         image=image,
@@ -127,13 +136,17 @@ def backgrounds_view(request):
         concept_option=json.dumps(concept_option),
         output_w=output_w,
         output_h=output_h,
+        output_format=output['format'],
         image_url=None  # URL은 생성 후 업데이트
     )
 
-    task = generate_background_task.delay(background_instance.id, user_id, image_id, gen_type, output_w, output_h, concept_option, unique_filename)
+    job_id = jobs.create('background_generation', background_id=background_instance.id)
+    task = generate_background_task.delay(background_instance.id, user_id, image_id, gen_type, output_w, output_h, concept_option, unique_filename,
+                                          fingerprint=fingerprint, output=output, job_id=job_id)
 
     return Response({
-        "background_id": background_instance.id
+        "background_id": background_instance.id,
+        "job_id": job_id
     }, status=status.HTTP_202_ACCEPTED)
 
 @swagger_auto_schema(
@@ -149,10 +162,17 @@ def backgrounds_view(request):
 @swagger_auto_schema(
     method='put',
     operation_id='생성된 이미지 수정',
-    operation_description='생성된 이미지를 수정합니다.',
+    operation_description='같은 옵션으로 배경 이미지를 다시 생성합니다. 생성은 비동기로 처리되며 완료되면 image_url이 바뀝니다.',
     tags=['backgrounds'],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'output_format': openapi.Schema(type=openapi.TYPE_STRING, description='결과 이미지 포맷 (기본값은 기존 포맷)', enum=list(encoding.FORMATS)),
+            'output_quality': openapi.Schema(type=openapi.TYPE_INTEGER, description='WebP/JPEG 품질', minimum=1, maximum=100),
+        }
+    ),
     responses={
-        200: BackgroundSerializer,
+        202: "Regeneration accepted.",
         400: "Bad Request",
         404: "Background not found.",
     }
@@ -179,85 +199,31 @@ def background_manage(request, backgroundId):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     elif request.method == 'PUT':
-        user = background.user
-        image = background.image
-        gen_type = background.gen_type
-        try:
-            concept_option = json.loads(background.concept_option)
-        except json.JSONDecodeError as e:
-            logger.error("JSONDecodeError: %s", e)
-            concept_option = {}  # 기본값 설정
-
-        output_w = background.output_w
-        output_h = background.output_h
-
-        image_url = image.image_url
-        try:
-            image_response = requests.get(image_url)
-            image_response.raise_for_status()
-            image_file = io.BytesIO(image_response.content)
-            logger.debug("Downloaded image from URL: %s", image_url)
-        except requests.RequestException as e:
-            logger.error("Failed to download image: %s", e)
-            return Response({"error": "Failed to download image"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        url = "https://api.draph.art/v1/generate/"
-        headers = {'Authorization': f'Bearer {settings.DRAPHART_API_KEY}'}
-        files = {
-            'image': ('image.jpg', image_file, 'image/jpeg')
-        }
-        data = {
-            "username": settings.DRAPHART_USER_NAME,
-            "gen_type": gen_type,
-            "multiblob_sod": settings.DRAPHART_MULTIBLOD_SOD,
-            "output_w": output_w,
-            "output_h": output_h,
-            "bg_color_hex_code": settings.DRAPHART_BD_COLOR_HEX_CODE,
-            'concept_option': json.dumps(concept_option),
-        }
-
-        response = requests.post(url, headers=headers, data=data, files=files)
-
-        if response.status_code != 200:
-            logger.debug("AI 이미지 생성 실패: %s", response.text)
-            return Response({"error": "AI 이미지 생성 실패", "details": response.text}, status=status.HTTP_400_BAD_REQUEST)
-
-        response_data = response.content
+        if not background.image.image_url:
+            return Response({"error": "이미지 업로드가 아직 완료되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            image_data = base64.b64decode(response_data)
-            image_bytes = io.BytesIO(image_data)
-            pil_image = PILImage.open(image_bytes)
-            pil_image = pil_image.convert('RGB')
-            png_image_bytes = io.BytesIO()
-            pil_image.save(png_image_bytes, format='PNG')
-            png_image_bytes.seek(0)
-
-            s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-            unique_filename = f"{uuid.uuid4()}.png"
-            s3.upload_fileobj(png_image_bytes, settings.AWS_STORAGE_BUCKET_NAME, unique_filename, ExtraArgs={'ContentType': 'image/png'})
-            s3_url = f"http://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{unique_filename}"
-
-        except Exception as e:
-            logger.error("Error uploading to S3: %s", e)
-            return Response({"error": "Failed to upload image to S3", "details": str(e)},
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        background.image_url = s3_url
-        background.recreated = True
-        background.save()
-
-        serializer = BackgroundSerializer(background)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            output = encoding.get_policy('background', request.data.get('output_format') or background.output_format,
+                                         request.data.get('output_quality'))
+        except encoding.OutputFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 다운로드/생성/업로드는 Celery 작업에서 처리하고 바로 응답
+        job_id = jobs.create('background_regeneration', background_id=background.id)
+        task = regenerate_background_task.delay(background.id, output=output, job_id=job_id)
+        return Response({
+            "background_id": background.id,
+            "job_id": job_id,
+            "task_id": task.id
+        }, status=status.HTTP_202_ACCEPTED)
 
     elif request.method == 'DELETE':
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        file_key = background.image_url.split('/')[-1]
-        try:
-            s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key)
-        except Exception as e:
-            logger.error("S3 파일 삭제 오류: %s", e)
-            return Response({"error": "S3 파일 삭제 오류", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-        background.delete()
+        # 생성 결과 캐시로 같은 객체를 쓰는 다른 배경이 있으면 S3 객체는 남겨둠
+        shared = background.image_url and Background.objects.filter(image_url=background.image_url).exclude(id=background.id).exists()
+        urls = [] if shared else [background.image_url, background.thumbnail_url, background.preview_url]
+
+        # S3 삭제는 행 삭제가 커밋된 뒤에 대기열에 넣고 바로 응답
+        with transaction.atomic():
+            background.delete()
+            transaction.on_commit(lambda: storage.enqueue_delete(urls), robust=True)
         return Response({"message": "Image deleted successfully."}, status=status.HTTP_200_OK)
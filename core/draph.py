@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django_redis import get_redis_connection
+from prometheus_client import Counter, Histogram
+from . import resilience
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# Draph 배경 생성 API 클라이언트
+# 프로세스마다 하나의 keep-alive 세션을 재사용해 호출마다 TLS 연결을 새로 맺지 않고,
+# 모든 웹/Celery 워커가 Redis로 API 키별 동시 요청 수를 공유해서 제공자 한도를 넘지 않도록 한다
+
+GENERATE_PATH = '/v1/generate/'
+
+draph_requests_total = Counter('draph_requests_total', 'Draph API 호출 수', ['result'])
+draph_slot_wait_seconds = Histogram('draph_slot_wait_seconds', 'Draph 동시 요청 슬롯을 얻기까지 기다린 시간')
+
+# 만료된 슬롯(죽은 워커가 남긴 것)을 정리한 뒤 한도 안이면 슬롯을 차지
+_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+    redis.call('EXPIRE', KEYS[1], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+class DraphError(Exception):
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def retryable(self):
+        # 연결 실패/시간 초과(상태 코드 없음), 5xx, 429만 다시 시도할 의미가 있음
+        return self.status_code is None or self.status_code >= 500 or self.status_code == 429
+
+
+class DraphBusy(DraphError):
+    # 동시 요청 한도 때문에 제한 시간 안에 슬롯을 얻지 못함
+    pass
+
+
+def get_session():
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.DRAPH_MAX_CONCURRENCY)
+            session.mount('https://', adapter)
+            session.headers['Authorization'] = f'Bearer {settings.DRAPHART_API_KEY}'
+            _session = session
+            _session_pid = pid
+    return _session
+
+
+def _slot_key():
+    # Redis 키에 API 키가 그대로 남지 않도록 해시 사용
+    digest = hashlib.sha256(settings.DRAPHART_API_KEY.encode()).hexdigest()[:16]
+    return f"draph_inflight:{digest}"
+
+
+def _lease_seconds():
+    # 슬롯을 가진 채로 워커가 죽어도 요청 제한 시간이 지나면 자동으로 반납됨
+    return settings.DRAPH_CONNECT_TIMEOUT + settings.DRAPH_READ_TIMEOUT + 30
+
+
+def acquire_slot():
+    redis_client = get_redis_connection('default')
+    token = uuid.uuid4().hex
+    started = time.monotonic()
+    deadline = started + settings.DRAPH_ACQUIRE_TIMEOUT
+    delay = 0.05
+    while True:
+        now = time.time()
+        acquired = redis_client.eval(
+            _ACQUIRE_SCRIPT, 1, _slot_key(),
+            now - _lease_seconds(), settings.DRAPH_MAX_CONCURRENCY, now, token, _lease_seconds(),
+        )
+        if acquired:
+            draph_slot_wait_seconds.observe(time.monotonic() - started)
+            return token
+        if time.monotonic() >= deadline:
+            draph_requests_total.labels(result='busy').inc()
+            raise DraphBusy("Draph API concurrency limit reached")
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+
+
+def release_slot(token):
+    get_redis_connection('default').zrem(_slot_key(), token)
+
+
+def generate(data, files):
+    """
+    배경 생성 API를 호출하고 응답(requests.Response)을 반환합니다.
+    상태 코드 확인은 호출하는 쪽에서 하며, 연결 실패/시간 초과는 DraphError로 올립니다.
+    Draph 서킷이 열려 있으면 슬롯을 기다리지 않고 바로 resilience.CircuitOpenError를 올립니다.
+    """
+    breaker = resilience.CircuitBreaker('draph')
+    breaker.allow()
+    token = acquire_slot()
+    try:
+        response = get_session().post(
+            f"{settings.DRAPH_API_URL}{GENERATE_PATH}",
+            data=data,
+            files=files,
+            timeout=(settings.DRAPH_CONNECT_TIMEOUT, settings.DRAPH_READ_TIMEOUT),
+        )
+    except requests.RequestException as e:
+        draph_requests_total.labels(result='error').inc()
+        breaker.record_failure()
+        raise DraphError(str(e))
+    finally:
+        release_slot(token)
+    draph_requests_total.labels(result='ok' if response.status_code == 200 else 'failed').inc()
+    # 429는 요청 문제가 아니라 제공자 쪽 한도 초과이므로 5xx와 같이 실패로 기록 (재시도는 DraphError.retryable로 백오프 후 수행)
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
@@ -0,0 +1,69 @@
+import io
+from django.conf import settings
+
+# 생성 결과 이미지의 출력 인코딩 정책
+# 엔드포인트별 기본값은 settings.OUTPUT_ENCODING에서 정하고, 요청의 output_format/output_quality로 바꿀 수 있다
+# 정책은 Celery 작업 인자로 넘기므로 JSON으로 직렬화되는 dict를 사용한다
+
+# 이름: (PIL 포맷, MIME 타입, 파일 확장자)
+FORMATS = {
+    'png': ('PNG', 'image/png', 'png'),
+    'webp': ('WEBP', 'image/webp', 'webp'),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+}
+DEFAULT_QUALITY = 90
+
+
+class OutputFormatError(ValueError):
+    pass
+
+
+def get_policy(endpoint, output_format=None, quality=None):
+    """
+    엔드포인트 기본 정책에 요청 값을 덮어써서 {'format', 'quality', 'optimize'}를 반환합니다.
+    잘못된 값이면 OutputFormatError를 올립니다.
+    """
+    policy = {'format': 'png', 'quality': DEFAULT_QUALITY, 'optimize': False}
+    policy.update(settings.OUTPUT_ENCODING.get(endpoint, {}))
+    if output_format:
+        policy['format'] = str(output_format).lower()
+    if quality is not None:
+        try:
+            policy['quality'] = int(quality)
+        except (TypeError, ValueError):
+            raise OutputFormatError("output_quality는 정수여야 합니다.")
+
+    if policy['format'] not in FORMATS:
+        raise OutputFormatError(f"output_format is invalid. 가능한 값 : {', '.join(FORMATS)}")
+    if not 1 <= policy['quality'] <= 100:
+        raise OutputFormatError("output_quality는 1~100 사이여야 합니다.")
+    return policy
+
+
+def content_type(policy):
+    return FORMATS[policy['format']][1]
+
+
+def extension(policy):
+    return FORMATS[policy['format']][2]
+
+
+def encode(pil_image, policy):
+    """
+    PIL 이미지를 정책에 맞는 포맷으로 인코딩해서 바이트로 반환합니다.
+    """
+    image_format = FORMATS[policy['format']][0]
+    options = {}
+    if image_format == 'PNG':
+        # PNG는 무손실이므로 quality 대신 압축 수준만 사용 (optimize는 느리지만 더 작음)
+        options = {'optimize': policy['optimize'], 'compress_level': 9 if policy['optimize'] else 6}
+    elif image_format == 'WEBP':
+        options = {'quality': policy['quality'], 'method': 6 if policy['optimize'] else 4}
+    elif image_format == 'JPEG':
+        options = {'quality': policy['quality'], 'optimize': policy['optimize'], 'progressive': policy['optimize']}
+
+    if pil_image.mode != 'RGB':
+        pil_image = pil_image.convert('RGB')
+    output = io.BytesIO()
+    pil_image.save(output, format=image_format, **options)
+    return output.getvalue()
@@ -0,0 +1,93 @@
+import logging
+from datetime import timedelta
+from urllib.parse import urlparse
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+from . import storage
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# S3 버킷에서 어떤 행도 참조하지 않는 객체(고아 객체)를 찾아 삭제하는 가비지 컬렉터
+# 소프트 삭제된 행, 행만 지운 삭제 경로, 실패한 작업이 남긴 업로드 파일을 정리한다
+
+# URL을 저장하는 모델과 컬럼 목록 (새 URL 컬럼을 추가하면 여기에도 추가해야 함)
+URL_FIELDS = [
+    ('image.Image', ['image_url', 'thumbnail_url', 'preview_url']),
+    ('background.Background', ['image_url', 'thumbnail_url', 'preview_url']),
+    ('recreated_background.RecreatedBackground', ['image_url']),
+    ('image_resizing.ImageResizing', ['image_url']),
+    ('video.Video', ['video_url']),
+    ('texttovideo.TextToVideo', ['video_url']),
+]
+
+LIST_PAGE_SIZE = 1000
+
+
+def _url_bucket(url, buckets):
+    host = urlparse(url).netloc
+    for bucket in buckets:
+        if host.startswith(f"{bucket}.s3."):
+            return bucket
+    return None
+
+
+def build_live_index(buckets):
+    """
+    삭제되지 않은 모든 행이 참조하는 객체 키를 {버킷: 키 집합}으로 만듭니다.
+    """
+    index = {bucket: set() for bucket in buckets}
+    for model_label, fields in URL_FIELDS:
+        model = apps.get_model(model_label)
+        rows = model.objects.filter(is_deleted=False).values_list(*fields)
+        for row in rows.iterator(chunk_size=5000):
+            for url in row:
+                if not url:
+                    continue
+                bucket = _url_bucket(url, buckets)
+                if bucket is not None:
+                    # 키를 인코딩하기 전에 저장된 URL은 경로가 원래 키 그대로이므로 두 형태를 모두 살아있는 키로 취급
+                    # (인덱스에 키가 더 있으면 지우지 않을 뿐이지만, 빠지면 사용 중인 객체를 지우게 됨)
+                    index[bucket].add(storage.object_key(url))
+                    index[bucket].add(storage.url_path(url))
+
+    # Presigned POST로 올라왔지만 아직 확인되지 않은 업로드는 URL이 없으므로 행에 저장된 S3 키로 보호
+    if settings.AWS_STORAGE_BUCKET_NAME in index:
+        upload_keys = apps.get_model('image.Image').objects.filter(is_deleted=False, upload_key__isnull=False) \
+            .values_list('upload_key', flat=True)
+        index[settings.AWS_STORAGE_BUCKET_NAME].update(upload_keys.iterator(chunk_size=5000))
+    return index
+
+
+def iter_orphan_pages(bucket, live_keys, grace_period):
+    """
+    list_objects_v2 페이지를 하나씩 읽으면서 페이지마다 고아 객체 키 목록을 반환합니다.
+    업로드 직후 아직 행에 URL이 저장되지 않은 객체를 지우지 않도록 grace_period보다 새 객체는 건너뜁니다.
+    """
+    cutoff = timezone.now() - timedelta(seconds=grace_period)
+    paginator = storage.get_s3_client().get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, PaginationConfig={'PageSize': LIST_PAGE_SIZE}):
+        orphans = [
+            obj['Key'] for obj in page.get('Contents', [])
+            if obj['Key'] not in live_keys and obj['LastModified'] < cutoff
+        ]
+        yield len(page.get('Contents', [])), orphans
+
+
+def collect_bucket(bucket, live_keys, grace_period):
+    """
+    버킷 하나의 고아 객체를 페이지 단위로 삭제하고 (검사한 객체 수, 삭제한 객체 수)를 반환합니다.
+    """
+    scanned = 0
+    deleted = 0
+    for page_size, orphans in iter_orphan_pages(bucket, live_keys, grace_period):
+        scanned += page_size
+        if not orphans:
+            continue
+        failed = storage.delete_objects(orphans, bucket)
+        if failed:
+            # 실패한 키는 다음 실행에서 다시 고아로 잡힘
+            logger.warning("Failed to delete %d orphaned objects from %s", len(failed), bucket)
+        deleted += len(orphans) - len(failed)
+    return scanned, deleted
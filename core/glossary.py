@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+import threading
+from django.conf import settings
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 카테고리/테마처럼 반복되는 짧은 한국어 용어의 영어 대응표
+# 입력 전체가 용어표로 덮이면 GPT를 호출하지 않고 바로 번역한다
+# 용어표 파일은 manage.py grow_glossary 명령으로 캐시된 번역에서 늘릴 수 있다 (프로세스 재시작 시 반영)
+
+_glossary = None
+_lock = threading.Lock()
+
+
+class Glossary:
+    def __init__(self, terms):
+        # 여러 단어로 된 용어도 단어 단위 최장 일치로 찾을 수 있도록 최대 단어 수를 미리 계산
+        self.terms = {' '.join(source.split()): target for source, target in terms.items()}
+        self.max_words = max((len(source.split()) for source in self.terms), default=0)
+
+    def _translate_phrase(self, phrase):
+        words = phrase.split()
+        output = []
+        i = 0
+        while i < len(words):
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                target = self.terms.get(' '.join(words[i:i + n]))
+                if target is not None:
+                    output.append(target)
+                    i += n
+                    break
+            else:
+                # 용어표에 없는 한국어 단어가 있으면 이 구절은 번역하지 못함
+                if any('가' <= ch <= '힣' or 'ㄱ' <= ch <= 'ㅣ' for ch in words[i]):
+                    return None
+                output.append(words[i])
+                i += 1
+        return ' '.join(output)
+
+    def lookup(self, text):
+        """
+        입력 전체를 용어표로 번역할 수 있으면 영어 문자열을, 아니면 None을 반환합니다.
+        """
+        phrases = []
+        for phrase in text.split(','):
+            translated = self._translate_phrase(phrase)
+            if translated is None:
+                return None
+            phrases.append(translated)
+        return ', '.join(phrase for phrase in phrases if phrase)
+
+
+def load_terms(path=None):
+    path = path or settings.TRANSLATION_GLOSSARY_PATH
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning("Translation glossary not found at %s", path)
+        return {}
+
+
+def save_terms(terms, path=None):
+    path = path or settings.TRANSLATION_GLOSSARY_PATH
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(terms, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def get_glossary():
+    global _glossary
+    if _glossary is None:
+        with _lock:
+            if _glossary is None:
+                _glossary = Glossary(load_terms())
+    return _glossary
+
+
+def lookup(text):
+    return get_glossary().lookup(text)
@@ -0,0 +1,157 @@
+import json
+import logging
+import time
+import uuid
+from django.conf import settings
+from django_redis import get_redis_connection
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 업로드/배경 생성/재생성/비디오 생성 등 비동기 작업의 진행 상태 저장소
+# 상태는 Redis 해시에 저장하고, 바뀔 때마다 pub/sub 채널로 알려서
+# 조회 API가 MySQL을 반복해서 조회하지 않고 변경될 때까지 기다렸다가 응답할 수 있도록 한다
+# (작업 인자로 job_id가 없으면 모든 함수는 아무것도 하지 않음)
+
+KEY_PREFIX = 'job:'
+CHANNEL_PREFIX = 'job_events:'
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+FINISHED_STATES = (COMPLETED, FAILED)
+
+
+def _key(job_id):
+    return f"{KEY_PREFIX}{job_id}"
+
+
+def _channel(job_id):
+    return f"{CHANNEL_PREFIX}{job_id}"
+
+
+def create(kind, **refs):
+    """
+    새 작업을 pending 상태로 만들고 job_id를 반환합니다. refs에는 관련 객체 ID를 넣습니다.
+    """
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    redis_client = get_redis_connection('default')
+    pipe = redis_client.pipeline()
+    pipe.hset(_key(job_id), mapping={
+        'kind': kind,
+        'state': PENDING,
+        'progress': 0,
+        'version': 1,
+        'refs': json.dumps(refs),
+        'created_at': now,
+        'updated_at': now,
+    })
+    pipe.expire(_key(job_id), settings.JOB_TTL)
+    pipe.execute()
+    return job_id
+
+
+def update(job_id, state=None, progress=None, result=None, error=None):
+    if not job_id:
+        return
+    fields = {'updated_at': time.time()}
+    if state is not None:
+        fields['state'] = state
+    if progress is not None:
+        fields['progress'] = int(progress)
+    if result is not None:
+        fields['result'] = json.dumps(result)
+    if error is not None:
+        fields['error'] = str(error)
+    try:
+        redis_client = get_redis_connection('default')
+        pipe = redis_client.pipeline()
+        pipe.hset(_key(job_id), mapping=fields)
+        pipe.hincrby(_key(job_id), 'version', 1)
+        pipe.expire(_key(job_id), settings.JOB_TTL)
+        version = pipe.execute()[1]
+        redis_client.publish(_channel(job_id), version)
+    except Exception as e:
+        # 상태 기록 실패로 실제 작업이 실패하지 않도록 함
+        logger.warning("Failed to update job %s: %s", job_id, e)
+
+
+def start(job_id):
+    update(job_id, state=RUNNING)
+
+
+def complete(job_id, result=None):
+    update(job_id, state=COMPLETED, progress=100, result=result)
+
+
+def fail(job_id, error):
+    update(job_id, state=FAILED, error=error)
+
+
+def advance(job_id, total, failed=False, finish=True):
+    """
+    여러 하위 작업으로 나뉜 작업에서 하위 작업 하나가 끝났음을 기록합니다.
+    finish가 True이면 마지막 하위 작업이 끝날 때 작업을 완료 상태로 바꿉니다.
+    (False이면 chord 콜백 등에서 complete를 따로 호출)
+    """
+    if not job_id:
+        return
+    try:
+        redis_client = get_redis_connection('default')
+        pipe = redis_client.pipeline()
+        pipe.hincrby(_key(job_id), 'done', 1)
+        pipe.hincrby(_key(job_id), 'failed', 1 if failed else 0)
+        done, failed_count = pipe.execute()
+    except Exception as e:
+        logger.warning("Failed to update job %s: %s", job_id, e)
+        return
+    if finish and done >= total:
+        if failed_count >= total:
+            update(job_id, state=FAILED, progress=100, error="모든 하위 작업이 실패했습니다.")
+        else:
+            update(job_id, state=COMPLETED, progress=100, result={'done': done, 'failed': failed_count})
+    else:
+        update(job_id, state=RUNNING, progress=min(done * 100 // total, 99))
+
+
+def get(job_id):
+    raw = get_redis_connection('default').hgetall(_key(job_id))
+    if not raw:
+        return None
+    job = {key.decode(): value.decode() for key, value in raw.items()}
+    return {
+        'id': job_id,
+        'kind': job['kind'],
+        'state': job['state'],
+        'progress': int(job.get('progress', 0)),
+        'version': int(job['version']),
+        'refs': json.loads(job.get('refs', '{}')),
+        'result': json.loads(job['result']) if 'result' in job else None,
+        'error': job.get('error'),
+        'created_at': float(job['created_at']),
+        'updated_at': float(job['updated_at']),
+    }
+
+
+def wait(job_id, version, timeout):
+    """
+    작업의 version이 주어진 값에서 바뀌거나 timeout(초)이 지날 때까지 기다렸다가 현재 상태를 반환합니다.
+    """
+    pubsub = get_redis_connection('default').pubsub(ignore_subscribe_messages=True)
+    try:
+        # 구독한 뒤에 상태를 읽어야 그 사이에 일어난 변경을 놓치지 않음
+        pubsub.subscribe(_channel(job_id))
+        job = get(job_id)
+        if job is None or job['version'] != version or job['state'] in FINISHED_STATES:
+            return job
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            if pubsub.get_message(timeout=remaining) is not None:
+                return get(job_id)
+    finally:
+        pubsub.close()
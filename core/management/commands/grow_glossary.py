@@ -0,0 +1,42 @@
+import json
+from django.core.management.base import BaseCommand
+from django_redis import get_redis_connection
+from core import glossary, translation
+
+
+class Command(BaseCommand):
+    help = 'Redis에 캐시된 GPT 번역 중 짧은 용어를 번역 용어표에 추가합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-words', type=int, default=3, help='용어표에 추가할 원문의 최대 단어 수')
+        parser.add_argument('--dry-run', action='store_true', help='파일을 쓰지 않고 추가될 용어만 출력')
+
+    def handle(self, *args, **options):
+        terms = glossary.load_terms()
+        added = {}
+        redis_client = get_redis_connection('default')
+        for key in redis_client.scan_iter(match=f"{translation.KEY_PREFIX}ko:en:*", count=1000):
+            raw = redis_client.get(key)
+            if raw is None:
+                continue
+            try:
+                entry = json.loads(raw)
+                source, target = entry['source'], entry['translation']
+            except (ValueError, KeyError, TypeError):
+                continue
+            # 문장이 아닌 짧은 용어만 추가 (콤마가 있으면 구절 단위로 다시 조합되므로 제외)
+            if source in terms or ',' in source or len(source.split()) > options['max_words']:
+                continue
+            if not target or len(target.split()) > options['max_words'] + 2:
+                continue
+            added[source] = target
+
+        for source, target in sorted(added.items()):
+            self.stdout.write(f"{source} -> {target}")
+        if options['dry_run']:
+            self.stdout.write(f"{len(added)} terms would be added")
+            return
+        if added:
+            terms.update(added)
+            glossary.save_terms(terms)
+        self.stdout.write(self.style.SUCCESS(f"Added {len(added)} terms to the glossary"))
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+
+
+class Command(BaseCommand):
+    help = 'django_celery_results 테이블의 예전 작업 결과를 작은 배치로 나눠서 삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=0, help='이 일수보다 오래된 결과만 삭제 (0이면 전부)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 삭제할 행 수')
+        parser.add_argument('--sleep', type=float, default=0.5, help='배치 사이에 쉬는 시간 (초)')
+        parser.add_argument('--dry-run', action='store_true', help='삭제하지 않고 대상 행 수만 출력')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        for model in (TaskResult, GroupResult):
+            queryset = model.objects.filter(date_done__lt=cutoff)
+            if options['dry_run']:
+                self.stdout.write(f"{model.__name__}: {queryset.count()} rows would be deleted")
+                continue
+            deleted = self.prune(queryset, options['batch_size'], options['sleep'])
+            self.stdout.write(self.style.SUCCESS(f"{model.__name__}: deleted {deleted} rows"))
+
+    def prune(self, queryset, batch_size, sleep):
+        # 범위 조건 DELETE는 긴 잠금을 잡으므로, PK를 먼저 읽고 PK 목록으로 짧게 나눠서 삭제
+        deleted = 0
+        last_pk = 0
+        while True:
+            pks = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+            last_pk = pks[-1]
+            self.stdout.write(f"{queryset.model.__name__}: deleted {deleted} rows so far")
+            if sleep:
+                time.sleep(sleep)
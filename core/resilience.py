@@ -0,0 +1,185 @@
+import logging
+import random
+import time
+import httpx
+import requests
+from django.conf import settings
+from django_redis import get_redis_connection
+from prometheus_client import Counter, Gauge
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 외부 생성 API(Draph, OpenAI, fal, aivideoapi) 호출의 재시도와 서킷 브레이커
+# 실패 횟수와 서킷 상태는 Redis에 두어 모든 웹/Celery 워커가 공유한다
+# - closed: 정상 호출, 연속 실패가 failure_threshold에 닿으면 open
+# - open: open_seconds 동안 호출하지 않고 바로 CircuitOpenError를 올림
+# - half_open: open 시간이 지나면 한 번만 시험 호출을 허용해서 성공하면 closed, 실패하면 다시 open
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+DEFAULTS = {
+    'max_attempts': 3,  # 첫 호출을 포함한 최대 시도 횟수
+    'base_delay': 1,  # 재시도 대기 시간의 기준 (초, 시도마다 두 배)
+    'max_delay': 30,
+    'failure_threshold': 5,  # 서킷을 여는 연속 실패 횟수
+    'open_seconds': 30,  # 서킷을 열어두는 시간
+}
+
+provider_calls_total = Counter('provider_calls_total', '외부 API 호출 수 (결과별)', ['provider', 'result'])
+provider_circuit_state = Gauge('provider_circuit_state', '외부 API 서킷 상태 (0: closed, 1: half_open, 2: open)', ['provider'])
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, provider):
+        super().__init__(f"{provider} API를 일시적으로 사용할 수 없습니다.")
+        self.provider = provider
+
+
+def get_config(provider):
+    config = dict(DEFAULTS)
+    config.update(settings.PROVIDER_RESILIENCE.get(provider, {}))
+    return config
+
+
+def backoff(provider, attempt):
+    """
+    attempt번째(0부터) 재시도 전에 기다릴 시간. 여러 워커가 동시에 몰리지 않도록 전체 구간에서 무작위로 고름
+    """
+    config = get_config(provider)
+    return random.uniform(0, min(config['max_delay'], config['base_delay'] * 2 ** attempt))
+
+
+def is_transient(exc):
+    # 연결 실패/시간 초과/5xx/429만 재시도 (4xx는 다시 보내도 같은 결과)
+    # requests(OpenAI, aivideoapi)와 httpx(fal_client) 예외를 모두 처리
+    response = getattr(exc, 'response', None)
+    if isinstance(exc, (requests.HTTPError, httpx.HTTPStatusError)) and response is not None:
+        return response.status_code >= 500 or response.status_code == 429
+    return isinstance(exc, (requests.RequestException, httpx.TransportError))
+
+
+class CircuitBreaker:
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.config = get_config(provider)
+
+    def _key(self, name):
+        return f"circuit:{self.provider}:{name}"
+
+    def state(self):
+        redis_client = get_redis_connection('default')
+        if redis_client.exists(self._key('open')):
+            return OPEN
+        if redis_client.exists(self._key('tripped')):
+            return HALF_OPEN
+        return CLOSED
+
+    def allow(self):
+        """
+        호출해도 되면 그냥 반환하고, 서킷이 열려 있으면 CircuitOpenError를 올립니다.
+        (Redis에 문제가 있으면 호출을 막지 않음)
+        """
+        try:
+            state = self.state()
+            if state == HALF_OPEN:
+                # 시험 호출은 하나만 허용하고 나머지는 결과가 나올 때까지 바로 실패
+                probe_timeout = self.config['open_seconds']
+                if get_redis_connection('default').set(self._key('probe'), 1, nx=True, ex=probe_timeout):
+                    return
+            elif state == CLOSED:
+                return
+        except Exception as e:
+            logger.warning("Circuit breaker for %s unavailable: %s", self.provider, e)
+            return
+        provider_calls_total.labels(provider=self.provider, result='rejected').inc()
+        raise CircuitOpenError(self.provider)
+
+    def record_success(self):
+        provider_calls_total.labels(provider=self.provider, result='success').inc()
+        try:
+            get_redis_connection('default').delete(self._key('failures'), self._key('tripped'), self._key('probe'))
+        except Exception as e:
+            logger.warning("Circuit breaker for %s unavailable: %s", self.provider, e)
+
+    def record_failure(self):
+        provider_calls_total.labels(provider=self.provider, result='failure').inc()
+        try:
+            redis_client = get_redis_connection('default')
+            if redis_client.exists(self._key('tripped')):
+                # 시험 호출이 실패하면 바로 다시 open
+                self._open(redis_client)
+                return
+            pipe = redis_client.pipeline()
+            pipe.incr(self._key('failures'))
+            pipe.expire(self._key('failures'), self.config['open_seconds'] * 10)
+            failures = pipe.execute()[0]
+            if failures >= self.config['failure_threshold']:
+                self._open(redis_client)
+        except Exception as e:
+            logger.warning("Circuit breaker for %s unavailable: %s", self.provider, e)
+
+    def _open(self, redis_client):
+        logger.warning("Opening circuit for %s for %d seconds", self.provider, self.config['open_seconds'])
+        pipe = redis_client.pipeline()
+        pipe.set(self._key('open'), 1, ex=self.config['open_seconds'])
+        # open이 만료된 뒤 half_open임을 알기 위한 표시 (오래 호출이 없으면 closed로 돌아감)
+        pipe.set(self._key('tripped'), 1, ex=self.config['open_seconds'] * 10)
+        pipe.delete(self._key('failures'), self._key('probe'))
+        pipe.execute()
+
+    def state_value(self):
+        # Prometheus 스크레이프 시점에 Redis의 상태를 읽음 (워커 프로세스가 바꾼 상태도 웹에서 보임)
+        try:
+            return STATE_VALUES[self.state()]
+        except Exception:
+            return -1
+
+
+def call(provider, func, *args, retry_if=is_transient, **kwargs):
+    """
+    서킷 브레이커를 거쳐 func를 호출하고, retry_if가 참인 예외는 백오프 후 다시 시도합니다.
+    요청 처리 중처럼 짧은 호출에 사용하고, Celery 작업에서는 retry_task로 작업을 다시 예약합니다.
+    """
+    breaker = CircuitBreaker(provider)
+    attempt = 0
+    while True:
+        breaker.allow()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if not retry_if(e):
+                # 요청 자체의 문제이므로 제공자 장애로 보지 않음
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            attempt += 1
+            if attempt >= breaker.config['max_attempts']:
+                raise
+            provider_calls_total.labels(provider=provider, result='retry').inc()
+            logger.warning("%s call failed (attempt %d), retrying: %s", provider, attempt, e)
+            time.sleep(backoff(provider, attempt - 1))
+            continue
+        breaker.record_success()
+        return result
+
+
+def retry_task(task, provider, exc):
+    """
+    재시도 횟수가 남아 있으면 백오프 후 Celery 작업을 다시 예약합니다. (celery.exceptions.Retry를 올림)
+    남아 있지 않으면 그냥 반환하므로 호출한 쪽에서 실패 처리를 이어서 합니다.
+    """
+    if task.request.retries + 1 >= get_config(provider)['max_attempts']:
+        return
+    provider_calls_total.labels(provider=provider, result='retry').inc()
+    countdown = backoff(provider, task.request.retries)
+    logger.warning("%s failed in %s, retrying in %.1fs: %s", provider, task.name, countdown, exc)
+    raise task.retry(exc=exc, countdown=countdown, max_retries=None)
+
+
+for _provider in settings.PROVIDER_RESILIENCE:
+    provider_circuit_state.labels(provider=_provider).set_function(CircuitBreaker(_provider).state_value)
@@ -0,0 +1,23 @@
+from celery.backends.redis import RedisBackend
+from django.conf import settings
+
+# Celery 작업 결과 저장소
+# 작업 결과는 API 트래픽을 처리하는 MySQL 대신 Redis에 저장하고 모두 만료 시간을 둔다
+# 기본 만료 시간은 CELERY_RESULT_EXPIRES, 작업 종류별 만료 시간은 CELERY_RESULT_EXPIRES_BY_TASK로 정한다
+# (사용 예: CELERY_RESULT_BACKEND = 'core.results:ExpiringRedisBackend+redis://redis:6379/2')
+
+
+def expires_for(task_name, default):
+    return settings.CELERY_RESULT_EXPIRES_BY_TASK.get(task_name, default)
+
+
+class ExpiringRedisBackend(RedisBackend):
+
+    def _store_result(self, task_id, result, state, traceback=None, request=None, **kwargs):
+        result = super()._store_result(task_id, result, state, traceback=traceback, request=request, **kwargs)
+        task_name = getattr(request, 'task', None)
+        expires = expires_for(task_name, self.expires) if task_name else self.expires
+        if expires and expires != self.expires:
+            # 기본 만료 시간으로 저장된 키의 TTL만 작업 종류에 맞게 바꿈
+            self.client.expire(self.get_key_for_task(task_id), int(expires))
+        return result
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+import time
+import uuid
+from urllib.parse import urlparse
+import requests
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from prometheus_client import Counter
+from . import storage
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# S3 원본 이미지를 노드 로컬 디스크에 보관하는 LRU 캐시
+# 같은 원본으로 재생성/리사이징을 반복할 때 매번 수 MB를 다시 내려받지 않도록 한다
+# 키는 (버킷, 객체 키, ETag)이므로 객체가 바뀌면 자동으로 새로 받는다
+
+STALE_PART_AGE = 60 * 60
+
+cache_requests_total = Counter('source_cache_requests_total', '원본 이미지 캐시 조회 수', ['result'])
+cache_bytes_total = Counter('source_cache_bytes_total', '원본 이미지 캐시에서 반환한 바이트 수', ['result'])
+cache_evictions_total = Counter('source_cache_evictions_total', '용량 초과로 삭제된 캐시 파일 수')
+
+
+class SourceFetchError(Exception):
+    pass
+
+
+def _bucket_for(url):
+    # 우리 버킷의 URL인지 확인 (외부 URL은 캐시하지 않음)
+    host = urlparse(url).netloc
+    for bucket in (settings.AWS_STORAGE_BUCKET_NAME, settings.AWS_STORAGE_BUCKET_NAME_VIDEO):
+        if host.startswith(f"{bucket}.s3."):
+            return bucket
+    return None
+
+
+def _cache_path(bucket, key, etag):
+    name = hashlib.sha256(f"{bucket}/{key}/{etag}".encode()).hexdigest()
+    return os.path.join(settings.SOURCE_CACHE_DIR, name)
+
+
+def _evict(max_bytes):
+    # 최근 사용 시각(mtime) 기준으로 오래된 파일부터 용량 한도 아래가 될 때까지 삭제
+    entries = []
+    total = 0
+    stale_deadline = time.time() - STALE_PART_AGE
+    with os.scandir(settings.SOURCE_CACHE_DIR) as it:
+        for entry in it:
+            try:
+                stat = entry.stat()
+                if entry.name.endswith('.part'):
+                    # 쓰는 도중 중단되어 남은 임시 파일 정리
+                    if stat.st_mtime < stale_deadline:
+                        os.remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            except FileNotFoundError:
+                continue
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        cache_evictions_total.inc()
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def fetch(url):
+    """
+    이미지 URL의 내용을 반환합니다. 우리 S3 버킷의 객체는 로컬 디스크 캐시를 거칩니다.
+    """
+    bucket = _bucket_for(url)
+    if bucket is None:
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise SourceFetchError(str(e))
+        return response.content
+
+    key = storage.object_key(url)
+    s3 = storage.get_s3_client()
+    try:
+        etag = s3.head_object(Bucket=bucket, Key=key)['ETag'].strip('"')
+        path = _cache_path(bucket, key, etag)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # LRU 순서를 위해 사용 시각 갱신
+            cache_requests_total.labels(result='hit').inc()
+            cache_bytes_total.labels(result='hit').inc(len(data))
+            return data
+        except FileNotFoundError:
+            pass
+
+        data = s3.get_object(Bucket=bucket, Key=key, IfMatch=etag)['Body'].read()
+    except (BotoCoreError, ClientError) as e:
+        raise SourceFetchError(str(e))
+
+    cache_requests_total.labels(result='miss').inc()
+    cache_bytes_total.labels(result='miss').inc(len(data))
+    try:
+        os.makedirs(settings.SOURCE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        _evict(settings.SOURCE_CACHE_MAX_BYTES)
+    except OSError as e:
+        # 캐시에 쓰지 못해도 내려받은 내용은 그대로 사용
+        logger.warning("Failed to write source cache for %s: %s", key, e)
+    return data
+
@@ -0,0 +1,189 @@
+import logging
+import os
+import threading
+from urllib.parse import quote, unquote
+import boto3
+import requests
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from django.conf import settings
+from django_redis import get_redis_connection
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 모든 앱이 함께 쓰는 S3 클라이언트 계층
+# boto3 클라이언트는 스레드 안전하므로 프로세스마다 하나만 만들어 커넥션 풀을 재사용한다
+# (Celery prefork/gunicorn 워커는 fork 되므로 pid가 바뀌면 새로 만든다)
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=settings.AWS_S3_TRANSFER_MAX_CONCURRENCY,
+    use_threads=True,
+)
+
+# 외부 URL에서 받은 응답을 그대로 흘려보내는 업로드용 설정
+# 크기를 모르는 스트림은 파트 단위로 메모리에 읽으므로, 메모리에 두는 파트 수를 병렬 수로 제한해서
+# 파일 크기와 상관없이 최대 multipart_chunksize * max_in_memory_upload_chunks 만큼만 사용
+STREAM_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=settings.AWS_S3_STREAM_MAX_CONCURRENCY,
+    use_threads=True,
+)
+# boto3의 TransferConfig 생성자는 이 값을 인자로 받지 않으므로 s3transfer 설정 속성을 직접 지정
+STREAM_TRANSFER_CONFIG.max_in_memory_upload_chunks = settings.AWS_S3_STREAM_MAX_CONCURRENCY
+
+
+def get_s3_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            session = boto3.session.Session(
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_S3_REGION_NAME,
+            )
+            _client = session.client('s3', config=Config(
+                max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+                connect_timeout=5,
+                read_timeout=60,
+                retries={'max_attempts': 5, 'mode': 'standard'},
+                tcp_keepalive=True,
+            ))
+            _client_pid = pid
+            logger.debug("Created S3 client for process %s", pid)
+    return _client
+
+
+def object_url(key, bucket=None):
+    # 모든 앱에서 같은 형식(https, 리전 엔드포인트)의 객체 URL을 사용
+    # 사용자가 정한 파일 이름의 #, ?, % 등이 URL 구분자로 해석되지 않도록 키를 인코딩
+    bucket = bucket or settings.AWS_STORAGE_BUCKET_NAME
+    return f"https://{bucket}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{quote(key)}"
+
+
+def url_path(url):
+    # 스킴과 호스트만 떼어낸 경로 (쿼리/프래그먼트로 해석하지 않음)
+    return url.split('://', 1)[-1].partition('/')[2]
+
+
+def object_key(url):
+    # http/https, 리전/글로벌 엔드포인트 형식의 URL 모두에서 객체 키를 추출
+    if not url:
+        return None
+    path = url_path(url)
+    # object_url이 만든 경로(인코딩된 키)만 디코딩하고, 키를 인코딩하지 않고 저장한 예전 URL은 경로를 그대로 키로 사용
+    # (예: 'uuid_100%.png'처럼 %가 그대로 들어간 키)
+    key = unquote(path)
+    if quote(key) != path:
+        key = path
+    return key or None
+
+
+def bucket_hosts(bucket):
+    # 버킷 객체 URL의 호스트 (리전 엔드포인트와 예전 글로벌 엔드포인트)
+    return {f"{bucket}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com", f"{bucket}.s3.amazonaws.com"}
+
+
+def upload_fileobj(file_obj, key, content_type, bucket=None, extra_args=None):
+    bucket = bucket or settings.AWS_STORAGE_BUCKET_NAME
+    args = {'ContentType': content_type}
+    args.update(extra_args or {})
+    get_s3_client().upload_fileobj(file_obj, bucket, key, ExtraArgs=args, Config=TRANSFER_CONFIG)
+    return object_url(key, bucket)
+
+
+def upload_from_url(url, key, content_type, bucket=None, extra_args=None, timeout=(5, 60)):
+    """
+    URL의 내용을 메모리나 임시 파일에 모두 받지 않고 S3 멀티파트 업로드로 바로 흘려보낸 뒤 객체 URL을 반환합니다.
+    """
+    bucket = bucket or settings.AWS_STORAGE_BUCKET_NAME
+    args = {'ContentType': content_type}
+    args.update(extra_args or {})
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        # gzip 등으로 전송된 응답도 원래 내용으로 풀어서 업로드
+        response.raw.decode_content = True
+        get_s3_client().upload_fileobj(response.raw, bucket, key, ExtraArgs=args, Config=STREAM_TRANSFER_CONFIG)
+    return object_url(key, bucket)
+
+
+def _to_key(url_or_key, bucket):
+    if '://' not in url_or_key:
+        return url_or_key
+    # 다른 버킷이나 외부 저장소의 URL이 같은 이름의 키로 바뀌어 삭제되지 않도록 호스트를 확인
+    host = url_or_key.split('://', 1)[1].partition('/')[0].lower()
+    if host not in bucket_hosts(bucket):
+        logger.warning("Skipping delete of %s: not an object of bucket %s", url_or_key, bucket)
+        return None
+    return object_key(url_or_key)
+
+
+# 삭제 대기열: 요청 처리 중에는 Redis 목록에 키만 넣고,
+# Celery 작업이 DeleteObjects API로 최대 1000개씩 묶어서 삭제한다
+
+DELETE_BATCH_SIZE = 1000
+DELETE_QUEUE_PREFIX = 's3_delete_queue:'
+DELETE_FLUSH_LOCK = 's3_delete_flush_scheduled'
+
+
+def delete_queue_key(bucket):
+    return f"{DELETE_QUEUE_PREFIX}{bucket}"
+
+
+def enqueue_delete(urls_or_keys, bucket=None):
+    """
+    S3 객체 삭제를 대기열에 넣고 곧 실행될 flush 작업을 예약합니다. (빈 값은 무시)
+    """
+    bucket = bucket or settings.AWS_STORAGE_BUCKET_NAME
+    keys = [_to_key(value, bucket) for value in urls_or_keys if value]
+    keys = [key for key in keys if key]
+    if not keys:
+        return 0
+
+    redis_client = get_redis_connection('default')
+    pipe = redis_client.pipeline()
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        pipe.rpush(delete_queue_key(bucket), *keys[start:start + DELETE_BATCH_SIZE])
+    pipe.execute()
+
+    # 짧은 시간 동안 들어온 삭제 요청을 한 번의 flush로 모음
+    if redis_client.set(DELETE_FLUSH_LOCK, 1, nx=True, ex=settings.S3_DELETE_FLUSH_DELAY * 6):
+        from .tasks import flush_s3_deletes
+        flush_s3_deletes.apply_async(countdown=settings.S3_DELETE_FLUSH_DELAY)
+    return len(keys)
+
+
+def pop_delete_batch(bucket):
+    # 대기열 앞에서 최대 DELETE_BATCH_SIZE개를 원자적으로 꺼냄
+    redis_client = get_redis_connection('default')
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.lrange(delete_queue_key(bucket), 0, DELETE_BATCH_SIZE - 1)
+    pipe.ltrim(delete_queue_key(bucket), DELETE_BATCH_SIZE, -1)
+    keys, _ = pipe.execute()
+    return [key.decode() for key in keys]
+
+
+def requeue_delete(keys, bucket):
+    if keys:
+        get_redis_connection('default').rpush(delete_queue_key(bucket), *keys)
+
+
+def delete_objects(keys, bucket):
+    """
+    DeleteObjects API로 한 번에 삭제하고 실패한 키 목록을 반환합니다.
+    """
+    response = get_s3_client().delete_objects(
+        Bucket=bucket,
+        Delete={'Objects': [{'Key': key} for key in keys], 'Quiet': True},
+    )
+    return [error['Key'] for error in response.get('Errors', [])]
@@ -0,0 +1,59 @@
+from celery import shared_task
+from django.conf import settings
+from django_redis import get_redis_connection
+import logging
+import random
+from . import gc, storage
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+def managed_buckets():
+    return [settings.AWS_STORAGE_BUCKET_NAME, settings.AWS_STORAGE_BUCKET_NAME_VIDEO]
+
+
+@shared_task(bind=True, max_retries=8, ignore_result=True)
+def flush_s3_deletes(self):
+    # 다음 삭제 요청이 새 flush를 예약할 수 있도록 먼저 잠금을 해제
+    get_redis_connection('default').delete(storage.DELETE_FLUSH_LOCK)
+
+    deleted = 0
+    for bucket in managed_buckets():
+        while True:
+            keys = storage.pop_delete_batch(bucket)
+            if not keys:
+                break
+            try:
+                failed = storage.delete_objects(keys, bucket)
+            except Exception as e:
+                # 꺼낸 키를 다시 넣고 지수 백오프로 재시도
+                storage.requeue_delete(keys, bucket)
+                countdown = min(2 ** self.request.retries * 5, 600) + random.uniform(0, 5)
+                logger.error("Failed to delete %d objects from %s: %s", len(keys), bucket, e)
+                raise self.retry(exc=e, countdown=countdown)
+            if failed:
+                logger.warning("Failed to delete %d objects from %s, requeued", len(failed), bucket)
+                storage.requeue_delete(failed, bucket)
+            deleted += len(keys) - len(failed)
+            if failed:
+                break
+    logger.info("Deleted %d objects from S3", deleted)
+    return deleted
+
+
+@shared_task(ignore_result=True)
+def collect_orphaned_objects():
+    # 살아있는 행의 URL 인덱스를 먼저 만들고 버킷 목록을 페이지 단위로 비교
+    buckets = managed_buckets()
+    index = gc.build_live_index(buckets)
+    result = {}
+    for bucket in buckets:
+        if not index[bucket]:
+            # DB 연결 설정 오류 등으로 인덱스가 비어 있으면 버킷 전체를 지우지 않도록 건너뜀
+            logger.warning("Live index for %s is empty, skipping orphan collection", bucket)
+            continue
+        scanned, deleted = gc.collect_bucket(bucket, index[bucket], settings.S3_GC_GRACE_PERIOD)
+        logger.info("Scanned %d objects in %s, deleted %d orphans", scanned, bucket, deleted)
+        result[bucket] = deleted
+    return result
@@ -0,0 +1,35 @@
+import pytest
+from unittest import mock
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from user.models import User
+from image.models import Image
+from background.models import Background
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestUserAssetsAPI:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create(nickname='testuser')
+        self.image = Image.objects.create(user=self.user, image_url='https://bucket.s3.ap-northeast-2.amazonaws.com/a.png')
+        Background.objects.create(user=self.user, image=self.image, output_w=1000, output_h=1000,
+                                  image_url='https://bucket.s3.ap-northeast-2.amazonaws.com/b.png')
+
+    def test_delete_all_assets(self, django_capture_on_commit_callbacks): #사용자 자산 전체 삭제 - S3 삭제는 커밋 후 대기열로
+        with mock.patch('core.storage.enqueue_delete', side_effect=lambda urls, bucket=None: len([u for u in urls if u])) as enqueue:
+            with django_capture_on_commit_callbacks() as callbacks:
+                response = self.client.delete(reverse('user-assets-manage', kwargs={'userId': self.user.id}))
+            enqueue.assert_not_called()
+            for callback in callbacks:
+                callback()
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['queued_objects'] == 2
+        assert enqueue.called
+        assert Image.objects.filter(user=self.user).count() == 0
+        assert Background.objects.filter(user=self.user).count() == 0
+
+    def test_delete_assets_nonexistent_user(self): #존재하지 않는 사용자
+        response = self.client.delete(reverse('user-assets-manage', kwargs={'userId': 999}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
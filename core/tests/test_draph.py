@@ -0,0 +1,39 @@
+from unittest import mock
+from django.test import override_settings
+import pytest
+from core import draph
+
+
+@override_settings(DRAPH_MAX_CONCURRENCY=1, DRAPH_ACQUIRE_TIMEOUT=0)
+def test_acquire_slot_busy(): #동시 요청 한도를 넘으면 DraphBusy
+    redis_client = mock.Mock()
+    redis_client.eval.return_value = 0
+    with mock.patch('core.draph.get_redis_connection', return_value=redis_client):
+        with pytest.raises(draph.DraphBusy):
+            draph.acquire_slot()
+
+
+def test_generate_releases_slot_on_error(): #요청이 실패해도 슬롯을 반납
+    session = mock.Mock()
+    session.post.side_effect = draph.requests.ConnectionError('connection refused')
+    with mock.patch('core.draph.acquire_slot', return_value='token'), \
+            mock.patch('core.draph.release_slot') as release_slot, \
+            mock.patch('core.draph.get_session', return_value=session), \
+            mock.patch('core.draph.resilience.CircuitBreaker'):
+        with pytest.raises(draph.DraphError):
+            draph.generate({}, {})
+    release_slot.assert_called_once_with('token')
+
+
+@pytest.mark.parametrize('status_code, failed', [(200, False), (400, False), (429, True), (503, True)])
+def test_generate_records_rate_limit_as_failure(status_code, failed): #429는 5xx와 같이 서킷에 실패로 기록
+    session = mock.Mock()
+    session.post.return_value = mock.Mock(status_code=status_code)
+    with mock.patch('core.draph.acquire_slot', return_value='token'), \
+            mock.patch('core.draph.release_slot'), \
+            mock.patch('core.draph.get_session', return_value=session), \
+            mock.patch('core.draph.resilience.CircuitBreaker') as circuit_breaker:
+        draph.generate({}, {})
+    breaker = circuit_breaker.return_value
+    assert breaker.record_failure.called == failed
+    assert breaker.record_success.called != failed
@@ -0,0 +1,30 @@
+import io
+from PIL import Image as PILImage
+import pytest
+from core import encoding
+
+
+@pytest.fixture
+def output_settings(settings):
+    settings.OUTPUT_ENCODING = {'background': {'format': 'webp', 'quality': 90}}
+    return settings
+
+
+def test_endpoint_default_and_override(output_settings): #엔드포인트 기본값을 요청 값으로 변경
+    assert encoding.get_policy('background') == {'format': 'webp', 'quality': 90, 'optimize': False}
+    assert encoding.get_policy('background', 'JPEG', '75') == {'format': 'jpeg', 'quality': 75, 'optimize': False}
+
+
+def test_invalid_values(output_settings): #지원하지 않는 포맷/품질
+    with pytest.raises(encoding.OutputFormatError):
+        encoding.get_policy('background', 'gif')
+    with pytest.raises(encoding.OutputFormatError):
+        encoding.get_policy('background', quality=0)
+
+
+@pytest.mark.parametrize('output_format', ['png', 'webp', 'jpeg'])
+def test_encode(output_format): #선택한 포맷으로 인코딩
+    policy = {'format': output_format, 'quality': 80, 'optimize': False}
+    data = encoding.encode(PILImage.new('RGBA', (32, 32), (255, 0, 0, 128)), policy)
+    with PILImage.open(io.BytesIO(data)) as pil_image:
+        assert pil_image.format == encoding.FORMATS[output_format][0]
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from unittest import mock
+from django.utils import timezone
+import pytest
+from core import gc, storage
+from user.models import User
+from image.models import Image
+from video.models import Video
+
+
+@pytest.mark.django_db
+def test_build_live_index(): #삭제되지 않은 행의 URL만 버킷별 키 인덱스에 포함
+    user = User.objects.create(nickname='testuser')
+    image = Image.objects.create(user=user, image_url='https://images.s3.ap-northeast-2.amazonaws.com/a.png',
+                         thumbnail_url='https://images.s3.ap-northeast-2.amazonaws.com/a_thumbnail.jpg')
+    Image.objects.create(user=user, image_url='https://example.com/external.png')
+    Video.objects.create(user=user, image=image, video_url='https://videos.s3.ap-northeast-2.amazonaws.com/v.mp4')
+    Video.objects.create(user=user, image=image, video_url='https://videos.s3.ap-northeast-2.amazonaws.com/deleted.mp4', is_deleted=True)
+
+    index = gc.build_live_index(['images', 'videos'])
+    assert index == {'images': {'a.png', 'a_thumbnail.jpg'}, 'videos': {'v.mp4'}}
+
+
+@pytest.mark.django_db
+def test_build_live_index_special_characters(settings): #파일 이름의 #, ?, %를 잘라내거나 잘못 풀지 않음
+    settings.AWS_STORAGE_BUCKET_NAME = 'images'
+    settings.AWS_S3_REGION_NAME = 'ap-northeast-2'
+    user = User.objects.create(nickname='testuser')
+    keys = ['uuid_photo#1.png', 'uuid_a?b.png', 'uuid_50%25off.png']
+    for key in keys:
+        Image.objects.create(user=user, image_url=storage.object_url(key))
+    # 키를 인코딩하지 않고 저장한 예전 URL
+    Image.objects.create(user=user, image_url='https://images.s3.ap-northeast-2.amazonaws.com/uuid_old#1.png')
+
+    index = gc.build_live_index(['images'])
+    assert set(keys) | {'uuid_old#1.png'} <= index['images']
+    assert 'uuid_photo' not in index['images'] and 'uuid_a' not in index['images']
+
+
+@pytest.mark.django_db
+def test_build_live_index_pending_presigned_upload(settings): #확인 전인 Presigned 업로드 객체도 살아있는 키로 취급
+    settings.AWS_STORAGE_BUCKET_NAME = 'images'
+    user = User.objects.create(nickname='testuser')
+    Image.objects.create(user=user, image_url='', upload_key='uuid_pending.png')
+
+    index = gc.build_live_index(['images'])
+    assert 'uuid_pending.png' in index['images']
+
+
+def test_iter_orphan_pages(): #참조되지 않고 유예 시간이 지난 객체만 페이지 단위로 반환
+    old = timezone.now() - timedelta(days=2)
+    new = timezone.now()
+    pages = [
+        {'Contents': [{'Key': 'live.png', 'LastModified': old}, {'Key': 'orphan.png', 'LastModified': old}]},
+        {'Contents': [{'Key': 'uploading.png', 'LastModified': new}]},
+        {},
+    ]
+    client = mock.Mock()
+    client.get_paginator.return_value.paginate.return_value = iter(pages)
+    with mock.patch('core.storage.get_s3_client', return_value=client):
+        result = list(gc.iter_orphan_pages('images', {'live.png'}, grace_period=60 * 60))
+    assert result == [(2, ['orphan.png']), (1, []), (0, [])]
@@ -0,0 +1,17 @@
+from core.glossary import Glossary
+
+
+class TestGlossary:
+    def setup_method(self):
+        self.glossary = Glossary({'꽃': 'flowers', '꽃밭': 'flower field', '파스텔 톤': 'pastel tone', '화장품': 'cosmetics'})
+
+    def test_longest_match(self): #긴 용어를 먼저 일치
+        assert self.glossary.lookup('꽃밭') == 'flower field'
+        assert self.glossary.lookup('파스텔 톤 꽃') == 'pastel tone flowers'
+
+    def test_uncovered_text(self): #용어표에 없는 한국어가 있으면 None
+        assert self.glossary.lookup('꽃집') is None
+        assert self.glossary.lookup('화장품, 봄') is None
+
+    def test_non_korean_words_pass_through(self): #영어/숫자는 그대로 유지
+        assert self.glossary.lookup('화장품, 2024 summer') == 'cosmetics, 2024 summer'
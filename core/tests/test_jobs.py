@@ -0,0 +1,31 @@
+from unittest import mock
+from django.test import override_settings
+from core import jobs
+
+
+@override_settings(JOB_TTL=60)
+def test_update_publishes_version(): #상태가 바뀌면 version을 올리고 채널로 알림
+    redis_client = mock.MagicMock()
+    redis_client.pipeline.return_value.execute.return_value = [1, 2, True]
+    with mock.patch('core.jobs.get_redis_connection', return_value=redis_client):
+        jobs.complete('abc', {'image_id': 1})
+    mapping = redis_client.pipeline.return_value.hset.call_args.kwargs['mapping']
+    assert mapping['state'] == jobs.COMPLETED
+    assert mapping['progress'] == 100
+    redis_client.publish.assert_called_once_with('job_events:abc', 2)
+
+
+def test_update_without_job_id(): #job_id가 없으면 아무것도 하지 않음
+    with mock.patch('core.jobs.get_redis_connection') as get_redis_connection:
+        jobs.start(None)
+        jobs.advance(None, 3)
+    get_redis_connection.assert_not_called()
+
+
+def test_wait_returns_immediately_when_changed(): #이미 version이 바뀌었으면 기다리지 않음
+    job = {'id': 'abc', 'version': 3, 'state': jobs.RUNNING}
+    redis_client = mock.MagicMock()
+    with mock.patch('core.jobs.get_redis_connection', return_value=redis_client), \
+            mock.patch('core.jobs.get', return_value=job):
+        assert jobs.wait('abc', 2, timeout=10) == job
+    redis_client.pubsub.return_value.get_message.assert_not_called()
@@ -0,0 +1,51 @@
+from unittest import mock
+from django.test import override_settings
+import pytest
+import requests
+from core import resilience
+
+PROVIDERS = {'test': {'max_attempts': 3, 'base_delay': 0, 'max_delay': 0, 'failure_threshold': 2, 'open_seconds': 30}}
+
+
+def server_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def test_is_transient(): #연결 실패/5xx/429만 재시도 대상
+    assert resilience.is_transient(requests.ConnectionError())
+    assert resilience.is_transient(server_error(503))
+    assert resilience.is_transient(server_error(429))
+    assert not resilience.is_transient(server_error(400))
+    assert not resilience.is_transient(ValueError())
+
+
+@override_settings(PROVIDER_RESILIENCE=PROVIDERS)
+def test_call_retries_transient_errors(): #일시적인 오류는 다시 시도해서 성공한 결과를 반환
+    func = mock.Mock(side_effect=[requests.Timeout(), 'ok'])
+    with mock.patch.object(resilience.CircuitBreaker, 'allow'), \
+            mock.patch.object(resilience.CircuitBreaker, 'record_failure') as record_failure, \
+            mock.patch.object(resilience.CircuitBreaker, 'record_success'):
+        assert resilience.call('test', func) == 'ok'
+    assert func.call_count == 2
+    record_failure.assert_called_once()
+
+
+@override_settings(PROVIDER_RESILIENCE=PROVIDERS)
+def test_call_does_not_retry_client_errors(): #4xx는 다시 시도하지 않음
+    func = mock.Mock(side_effect=server_error(400))
+    with mock.patch.object(resilience.CircuitBreaker, 'allow'), \
+            mock.patch.object(resilience.CircuitBreaker, 'record_success'):
+        with pytest.raises(requests.HTTPError):
+            resilience.call('test', func)
+    assert func.call_count == 1
+
+
+@override_settings(PROVIDER_RESILIENCE=PROVIDERS)
+def test_open_circuit_fails_fast(): #서킷이 열려 있으면 호출하지 않음
+    func = mock.Mock()
+    with mock.patch.object(resilience.CircuitBreaker, 'state', return_value=resilience.OPEN):
+        with pytest.raises(resilience.CircuitOpenError):
+            resilience.call('test', func)
+    func.assert_not_called()
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+from unittest import mock
+from celery import Celery
+from django.test import override_settings
+from core.results import ExpiringRedisBackend
+
+
+def make_backend():
+    # 실제 백엔드를 만들고 Redis 연결만 가짜로 바꿈 (연결은 client를 처음 쓸 때 생성됨)
+    app = Celery(set_as_current=False)
+    backend = ExpiringRedisBackend(app=app, url='redis://localhost:6379/2', expires=60 * 60 * 24)
+    backend.client = mock.MagicMock()
+    return backend
+
+
+@override_settings(CELERY_RESULT_EXPIRES_BY_TASK={'background.tasks.generate_background_variant_task': 60})
+def test_store_result_uses_task_expiry(): #작업 종류별 만료 시간이 있으면 TTL을 바꿈
+    backend = make_backend()
+    request = SimpleNamespace(task='background.tasks.generate_background_variant_task')
+    with mock.patch('celery.backends.redis.RedisBackend._store_result', return_value='ok'):
+        backend._store_result('abc', 'ok', 'SUCCESS', request=request)
+    backend.client.expire.assert_called_once_with(backend.get_key_for_task('abc'), 60)
+
+
+@override_settings(CELERY_RESULT_EXPIRES_BY_TASK={})
+def test_store_result_keeps_default_expiry(): #설정이 없으면 기본 만료 시간을 그대로 사용
+    backend = make_backend()
+    request = SimpleNamespace(task='image.tasks.upload_image_to_s3')
+    with mock.patch('celery.backends.redis.RedisBackend._store_result', return_value='ok'):
+        backend._store_result('abc', 'ok', 'SUCCESS', request=request)
+    backend.client.expire.assert_not_called()
@@ -0,0 +1,17 @@
+import os
+import time
+from django.test import override_settings
+from core import source_cache
+
+
+def test_evict_least_recently_used(tmp_path): #용량 초과 시 오래 사용하지 않은 파일부터 삭제
+    now = time.time()
+    for age, name in [(300, 'old'), (200, 'middle'), (100, 'new')]:
+        path = tmp_path / name
+        path.write_bytes(b'x' * 10)
+        os.utime(path, (now - age, now - age))
+
+    with override_settings(SOURCE_CACHE_DIR=str(tmp_path)):
+        source_cache._evict(max_bytes=20)
+
+    assert sorted(os.listdir(tmp_path)) == ['middle', 'new']
@@ -0,0 +1,62 @@
+from unittest import mock
+import pytest
+from core import storage
+
+
+@pytest.fixture
+def s3_settings(settings):
+    settings.AWS_STORAGE_BUCKET_NAME = 'test-bucket'
+    settings.AWS_S3_REGION_NAME = 'ap-northeast-2'
+    return settings
+
+
+def test_object_url(s3_settings): #모든 앱에서 같은 형식의 URL 생성
+    assert storage.object_url('a.png') == 'https://test-bucket.s3.ap-northeast-2.amazonaws.com/a.png'
+    assert storage.object_url('a.mp4', bucket='video') == 'https://video.s3.ap-northeast-2.amazonaws.com/a.mp4'
+
+
+def test_object_key(s3_settings): #기존에 저장된 여러 형식의 URL에서 키 추출
+    assert storage.object_key('http://test-bucket.s3.ap-northeast-2.amazonaws.com/a.png') == 'a.png'
+    assert storage.object_key('https://test-bucket.s3.amazonaws.com/uuid_my%20file.png') == 'uuid_my file.png'
+    assert storage.object_key('') is None
+
+
+def test_object_key_legacy_unquoted_url(s3_settings): #키를 인코딩하지 않고 저장한 예전 URL은 경로를 그대로 키로 사용
+    assert storage.object_key('https://test-bucket.s3.amazonaws.com/uuid_100%.png') == 'uuid_100%.png'
+    assert storage.object_key('https://test-bucket.s3.amazonaws.com/uuid_50%25 off.png') == 'uuid_50%25 off.png'
+
+
+@pytest.mark.parametrize('key', ['uuid_photo#1.png', 'uuid_a?b.png', 'uuid_50%25off.png', 'uuid_my file.png'])
+def test_object_key_round_trip(s3_settings, key): #파일 이름에 URL 구분자가 있어도 같은 키로 돌아옴
+    assert storage.object_key(storage.object_url(key)) == key
+
+
+def test_upload_from_url_streams_response(s3_settings): #응답 본문을 읽지 않고 raw 스트림을 그대로 업로드
+    response = mock.MagicMock()
+    response.__enter__.return_value = response
+    client = mock.Mock()
+    with mock.patch('core.storage.requests.get', return_value=response) as get, \
+            mock.patch('core.storage.get_s3_client', return_value=client):
+        url = storage.upload_from_url('https://provider/video.mp4', 'a.mp4', 'video/mp4')
+    assert url == 'https://test-bucket.s3.ap-northeast-2.amazonaws.com/a.mp4'
+    assert get.call_args.kwargs['stream'] is True
+    assert client.upload_fileobj.call_args.args[:3] == (response.raw, 'test-bucket', 'a.mp4')
+
+
+def test_stream_transfer_config(settings): #스트리밍 업로드는 병렬 수만큼만 파트를 메모리에 둠
+    assert storage.STREAM_TRANSFER_CONFIG.max_concurrency == settings.AWS_S3_STREAM_MAX_CONCURRENCY
+    assert storage.STREAM_TRANSFER_CONFIG.max_in_memory_upload_chunks == settings.AWS_S3_STREAM_MAX_CONCURRENCY
+
+
+def test_enqueue_delete_skips_other_hosts(s3_settings): #다른 버킷/외부 저장소의 URL은 삭제 대기열에 넣지 않음
+    redis_client = mock.Mock()
+    redis_client.set.return_value = False
+    with mock.patch('core.storage.get_redis_connection', return_value=redis_client):
+        queued = storage.enqueue_delete([
+            'https://test-bucket.s3.ap-northeast-2.amazonaws.com/uuid_my%20file.png',
+            'https://storage.googleapis.com/example.mp4',
+            'https://video.s3.ap-northeast-2.amazonaws.com/a.mp4',
+            None,
+        ])
+    assert queued == 1
+    redis_client.pipeline.return_value.rpush.assert_called_once_with(storage.delete_queue_key('test-bucket'), 'uuid_my file.png')
@@ -0,0 +1,51 @@
+from unittest import mock
+from django.test import override_settings
+from core import translation
+
+
+def test_normalize(): #공백만 다른 입력은 같은 키
+    assert translation.normalize('  화장품   광고 ') == '화장품 광고'
+
+
+@override_settings(TRANSLATION_LOCAL_CACHE_SIZE=10, TRANSLATION_CACHE_TTL=60)
+def test_translate_uses_local_cache(): #두 번째 요청은 GPT와 Redis를 거치지 않음
+    translation._local_cache.clear()
+    redis_client = mock.Mock()
+    redis_client.get.return_value = None
+    with mock.patch('core.translation.get_redis_connection', return_value=redis_client), \
+            mock.patch('core.translation._request_translation', return_value='cosmetics advertisement') as request_translation:
+        assert translation.translate('화장품 광고') == 'cosmetics advertisement'
+        assert translation.translate(' 화장품  광고 ') == 'cosmetics advertisement'
+    assert request_translation.call_count == 1
+    assert redis_client.get.call_count == 1
+
+
+def test_translate_failure_returns_original(): #번역 실패 시 원문 반환, 캐시하지 않음
+    translation._local_cache.clear()
+    redis_client = mock.Mock()
+    redis_client.get.return_value = None
+    with mock.patch('core.translation.get_redis_connection', return_value=redis_client), \
+            mock.patch('core.translation._request_translation', side_effect=Exception('timeout')):
+        assert translation.translate('음식 광고') == '음식 광고'
+    assert not translation._local_cache
+    redis_client.set.assert_not_called()
+
+
+def test_translate_glossary_terms(): #용어표로 덮이는 입력은 GPT/Redis를 거치지 않음
+    with mock.patch('core.translation.get_redis_connection') as get_redis_connection, \
+            mock.patch('core.translation._request_translation') as request_translation:
+        assert translation.translate('화장품') == 'cosmetics'
+        assert translation.translate('모던한 대리석, 꽃밭') == 'modern marble, flower field'
+    get_redis_connection.assert_not_called()
+    request_translation.assert_not_called()
+
+
+def test_translate_reads_plain_cached_value(): #JSON이 아닌 예전 형식의 캐시 값도 번역으로 사용
+    translation._local_cache.clear()
+    redis_client = mock.Mock()
+    redis_client.get.return_value = 'jewelry advertisement'.encode()
+    with mock.patch('core.translation.get_redis_connection', return_value=redis_client), \
+            mock.patch('core.translation._request_translation') as request_translation:
+        assert translation.translate('보석 광고') == 'jewelry advertisement'
+    request_translation.assert_not_called()
+    assert redis_client.get.call_args[0][0].startswith('translation:v2:')
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+import requests
+from django.conf import settings
+from django_redis import get_redis_connection
+from prometheus_client import Counter, Histogram
+from . import glossary, resilience
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 모든 앱이 함께 쓰는 한국어→영어 번역 서비스
+# 용어표 → 프로세스 내 LRU → Redis(TTL) → GPT 순서로 조회해서, 자주 쓰는 카테고리/테마는 네트워크 없이 번역한다
+
+OPENAI_CHAT_URL = 'https://api.openai.com/v1/chat/completions'
+# 값 형식이 바뀌면 버전을 올려서 예전 형식의 값을 읽지 않도록 함 (v2: 원문과 번역을 담은 JSON)
+KEY_PREFIX = 'translation:v2:'
+
+translation_requests_total = Counter('translation_requests_total', '번역 요청 수 (응답한 계층별)', ['source'])
+translation_upstream_seconds = Histogram('translation_upstream_seconds', 'GPT 번역 호출 시간')
+translation_saved_seconds_total = Counter('translation_saved_seconds_total', '캐시 적중으로 절약한 예상 번역 시간 (초)')
+
+_local_cache = OrderedDict()
+_local_lock = threading.Lock()
+_session = requests.Session()
+# 최근 GPT 호출 시간의 지수 이동 평균 (캐시 적중 시 절약한 시간 추정에 사용)
+_upstream_latency = None
+
+
+def is_korean(text):
+    # 간단하게 한국어 문자가 포함되어 있는지 확인
+    return bool(re.search('[ㄱ-ㅣ가-힣]', text))
+
+
+def normalize(text):
+    # 유니코드 정규화와 공백 정리만 다른 입력은 같은 캐시 키를 사용
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def _cache_key(text, source_language, target_language):
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    return f"{KEY_PREFIX}{source_language}:{target_language}:{digest}"
+
+
+def _local_get(key):
+    with _local_lock:
+        value = _local_cache.get(key)
+        if value is not None:
+            _local_cache.move_to_end(key)
+        return value
+
+
+def _local_put(key, value):
+    with _local_lock:
+        _local_cache[key] = value
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > settings.TRANSLATION_LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+
+def _record_hit(source):
+    translation_requests_total.labels(source=source).inc()
+    if _upstream_latency is not None:
+        translation_saved_seconds_total.inc(_upstream_latency)
+
+
+def _request_translation(text, source_language, target_language):
+    global _upstream_latency
+    headers = {
+        'Authorization': f'Bearer {settings.OPENAI_API_KEY}',
+        'Content-Type': 'application/json'
+    }
+    data = {
+        "model": "gpt-4",
+        "messages": [
+            {"role": "system", "content": f"Translate the following text from {source_language} to {target_language}."},
+            {"role": "user", "content": text}
+        ],
+        "max_tokens": 100
+    }
+    started = time.monotonic()
+    response = _session.post(OPENAI_CHAT_URL, headers=headers, json=data, timeout=(5, 30))
+    response.raise_for_status()
+    elapsed = time.monotonic() - started
+    translation_upstream_seconds.observe(elapsed)
+    _upstream_latency = elapsed if _upstream_latency is None else 0.8 * _upstream_latency + 0.2 * elapsed
+    return response.json()['choices'][0]['message']['content'].strip().strip('\"')
+
+
+def _decode(cached):
+    # JSON이 아닌 값(예전 형식의 번역 문자열)은 값 자체를 번역으로 사용
+    if isinstance(cached, bytes):
+        cached = cached.decode()
+    try:
+        entry = json.loads(cached)
+    except ValueError:
+        return cached
+    return entry['translation'] if isinstance(entry, dict) else cached
+
+
+def translate(text, source_language='ko', target_language='en'):
+    """
+    텍스트를 번역합니다. 번역에 실패하면 원문을 그대로 반환합니다. (실패 결과는 캐시하지 않음)
+    """
+    normalized = normalize(text)
+    if not normalized:
+        return text
+    if (source_language, target_language) == ('ko', 'en'):
+        translation = glossary.lookup(normalized)
+        if translation is not None:
+            _record_hit('glossary')
+            return translation
+
+    key = _cache_key(normalized, source_language, target_language)
+
+    translation = _local_get(key)
+    if translation is not None:
+        _record_hit('local')
+        return translation
+
+    try:
+        cached = get_redis_connection('default').get(key)
+    except Exception as e:
+        logger.warning("Translation cache unavailable: %s", e)
+        cached = None
+    if cached is not None:
+        translation = _decode(cached)
+        _local_put(key, translation)
+        _record_hit('redis')
+        return translation
+
+    try:
+        # OpenAI 서킷이 열려 있으면 기다리지 않고 원문을 반환
+        translation = resilience.call('openai', _request_translation, normalized, source_language, target_language)
+    except Exception as e:
+        logger.error("Error translating text: %s", e)
+        translation_requests_total.labels(source='error').inc()
+        return text
+
+    translation_requests_total.labels(source='upstream').inc()
+    _local_put(key, translation)
+    try:
+        # 용어표를 늘릴 때 원문이 필요하므로 원문도 함께 저장
+        value = json.dumps({'source': normalized, 'translation': translation}, ensure_ascii=False)
+        get_redis_connection('default').set(key, value, ex=settings.TRANSLATION_CACHE_TTL)
+    except Exception as e:
+        logger.warning("Failed to store translation in cache: %s", e)
+    return translation
+
+
+def translate_concept_option(concept_option):
+    """
+    concept_option의 category/theme가 한국어이면 영어로 바꾼 새 dict를 반환합니다.
+    """
+    concept_option = dict(concept_option or {})
+    for field in ('category', 'theme'):
+        value = concept_option.get(field)
+        if isinstance(value, str) and is_korean(value):
+            concept_option[field] = translate(value)
+    return concept_option
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import user_assets_manage, job_detail
+
+urlpatterns = [
+    path('users/<int:userId>/assets/', user_assets_manage, name='user-assets-manage'),  # 사용자 자산 전체 삭제 엔드포인트
+    path('jobs/<str:jobId>', job_detail, name='job-detail'),  # 비동기 작업 상태 조회 (long-polling)
+]
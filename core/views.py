@@ -0,0 +1,137 @@
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework import status
+from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from user.models import User
+from image.models import Image
+from background.models import Background
+from recreated_background.models import RecreatedBackground
+from image_resizing.models import ImageResizing
+from video.models import Video
+from texttovideo.models import TextToVideo
+from . import jobs, storage
+import logging
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+def _values(queryset, *fields):
+    # URL 컬럼만 스트리밍으로 읽어서 하나의 목록으로 펼침
+    for row in queryset.values_list(*fields).iterator(chunk_size=storage.DELETE_BATCH_SIZE):
+        yield from row
+
+
+@swagger_auto_schema(
+    method='delete',
+    operation_id='사용자 자산 전체 삭제',
+    operation_description='사용자가 업로드/생성한 이미지, 배경, 리사이징, 비디오를 모두 삭제합니다. S3 객체는 삭제 대기열을 통해 일괄 삭제됩니다.',
+    tags=['Users'],
+    responses={
+        200: openapi.Response('삭제 성공', openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'queued_objects': openapi.Schema(type=openapi.TYPE_INTEGER, description='삭제 대기열에 들어간 S3 객체 수'),
+            }
+        )),
+        404: "User not found.",
+    }
+)
+@api_view(['DELETE'])
+def user_assets_manage(request, userId):
+    try:
+        user = User.objects.get(id=userId)
+    except User.DoesNotExist:
+        return Response({"error": "사용자 없음"}, status=status.HTTP_404_NOT_FOUND)
+
+    images = Image.objects.filter(user=user)
+    backgrounds = Background.objects.filter(user=user)
+    recreated_backgrounds = RecreatedBackground.objects.filter(background__user=user)
+    resizings = ImageResizing.objects.filter(Q(background__user=user) | Q(recreated_background__background__user=user))
+    videos = Video.objects.filter(user=user)
+    text_to_videos = TextToVideo.objects.filter(user=user)
+
+    # 중복 제거로 다른 사용자의 이미지와 공유 중인 객체는 남겨둠
+    shared_urls = set(
+        Image.objects.filter(image_url__in=images.values('image_url')).exclude(user=user).values_list('image_url', flat=True)
+    )
+
+    # 생성 결과 캐시로 다른 사용자의 배경과 공유 중인 객체도 남겨둠
+    shared_background_urls = set(
+        Background.objects.filter(image_url__in=backgrounds.values('image_url')).exclude(user=user).values_list('image_url', flat=True)
+    )
+
+    # 행을 지우기 전에 삭제할 객체 URL을 (버킷, URL 목록)으로 모아둠
+    deletions = [
+        (None, _values(images.exclude(image_url__in=shared_urls), 'image_url', 'thumbnail_url', 'preview_url')),
+        (None, _values(backgrounds.exclude(image_url__in=shared_background_urls), 'image_url', 'thumbnail_url', 'preview_url')),
+        (None, _values(recreated_backgrounds, 'image_url')),
+        (None, _values(resizings, 'image_url')),
+        (settings.AWS_STORAGE_BUCKET_NAME_VIDEO, _values(videos, 'video_url')),
+        (settings.AWS_STORAGE_BUCKET_NAME_VIDEO, _values(text_to_videos, 'video_url')),
+    ]
+    deletions = [(bucket, [url for url in urls if url]) for bucket, urls in deletions]
+    queued = sum(len(urls) for _, urls in deletions)
+
+    # 재생성/리사이징은 배경과 함께 CASCADE로 삭제됨
+    with transaction.atomic():
+        backgrounds.delete()
+        videos.delete()
+        images.delete()
+        text_to_videos.delete()
+        # 트랜잭션이 커밋된 뒤에만 S3 객체를 지움 (롤백되면 행이 남아 있으므로 객체도 남겨둠)
+        for bucket, urls in deletions:
+            transaction.on_commit(lambda bucket=bucket, urls=urls: storage.enqueue_delete(urls, bucket=bucket), robust=True)
+
+    logger.info("Deleted all assets of User %s, %d S3 objects queued", user.id, queued)
+    return Response({"message": "사용자 자산이 모두 삭제되었습니다.", "queued_objects": queued}, status=status.HTTP_200_OK)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_id='비동기 작업 상태 조회',
+    operation_description='업로드/배경 생성/재생성/비디오 생성 작업의 상태, 진행률, 결과와 오류를 조회합니다.\n\n'
+                          'wait와 version을 함께 보내면 작업의 version이 바뀌거나 wait초가 지날 때까지 기다렸다가 응답합니다. (long-polling)',
+    tags=['Jobs'],
+    manual_parameters=[
+        openapi.Parameter('wait', openapi.IN_QUERY, description='최대 대기 시간 (초)', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('version', openapi.IN_QUERY, description='마지막으로 받은 작업의 version', type=openapi.TYPE_INTEGER),
+    ],
+    responses={
+        200: openapi.Response('작업 상태', openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'id': openapi.Schema(type=openapi.TYPE_STRING),
+                'kind': openapi.Schema(type=openapi.TYPE_STRING, description='작업 종류'),
+                'state': openapi.Schema(type=openapi.TYPE_STRING, enum=[jobs.PENDING, jobs.RUNNING, jobs.COMPLETED, jobs.FAILED]),
+                'progress': openapi.Schema(type=openapi.TYPE_INTEGER, description='진행률 (0~100)'),
+                'version': openapi.Schema(type=openapi.TYPE_INTEGER, description='상태가 바뀔 때마다 증가'),
+                'refs': openapi.Schema(type=openapi.TYPE_OBJECT, description='관련 객체 ID'),
+                'result': openapi.Schema(type=openapi.TYPE_OBJECT, description='완료 시 결과'),
+                'error': openapi.Schema(type=openapi.TYPE_STRING, description='실패 사유'),
+            }
+        )),
+        400: "Bad request.",
+        404: "Job not found.",
+    }
+)
+@api_view(['GET'])
+def job_detail(request, jobId):
+    try:
+        wait = min(int(request.query_params.get('wait', 0)), settings.JOB_LONG_POLL_MAX_WAIT)
+        version = request.query_params.get('version')
+        version = int(version) if version is not None else None
+    except ValueError:
+        return Response({"error": "wait와 version은 정수여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if wait > 0 and version is not None:
+        job = jobs.wait(jobId, version, wait)
+    else:
+        job = jobs.get(jobId)
+    if job is None:
+        return Response({"error": "해당 작업이 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+    return Response(job, status=status.HTTP_200_OK)
@@ -0,0 +1,34 @@
+import logging
+from PIL import Image as PILImage, UnidentifiedImageError
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# PIL 포맷 이름 → (파일 확장자, MIME 타입)
+FORMAT_FILE_INFO = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'GIF': ('gif', 'image/gif'),
+    'WEBP': ('webp', 'image/webp'),
+}
+
+
+def extract_metadata(file_obj):
+    """
+    이미지 헤더만 읽어 크기/포맷/모드/EXIF 방향을 추출합니다. (픽셀 데이터는 디코딩하지 않음)
+    읽은 뒤 파일 위치는 처음으로 되돌립니다.
+    """
+    metadata = {}
+    try:
+        with PILImage.open(file_obj) as pil_image:
+            metadata['width'], metadata['height'] = pil_image.size
+            metadata['format'] = pil_image.format
+            metadata['mode'] = pil_image.mode
+            metadata['orientation'] = pil_image.getexif().get(EXIF_ORIENTATION_TAG)
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning("Failed to read image metadata: %s", e)
+    finally:
+        file_obj.seek(0)
+    return metadata
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image', '0003_image_metadata'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='thumbnail_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='image',
+            name='preview_url',
+            field=models.URLField(blank=True, max_length=500, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image', '0004_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='upload_batch',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image', '0005_image_upload_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='upload_key',
+            field=models.CharField(blank=True, max_length=300, null=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from user.models import User
+from .metadata import FORMAT_FILE_INFO
 
 class Image(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, default =1) #만약 오류뜨면 -> , default=1 설정 넣어줘서 입력. 처음에는 사용자가 없어서 오류남
@@ -7,6 +8,51 @@ class Image(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
     image_url = models.URLField(max_length=500, blank=True, null=True)  # 외부 URL을 위한 필드
+    content_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)  # 파일 내용의 SHA-256 해시 (중복 업로드 제거용)
+    # 업로드 시점에 추출한 이미지 메타데이터 (S3에서 다시 내려받지 않고 검증/분기에 사용)
+    width = models.IntegerField(blank=True, null=True)
+    height = models.IntegerField(blank=True, null=True)
+    format = models.CharField(max_length=10, blank=True, null=True)  # PIL 포맷 이름 (JPEG, PNG, GIF ...)
+    mode = models.CharField(max_length=10, blank=True, null=True)  # PIL 색상 모드 (RGB, RGBA, P ...)
+    orientation = models.SmallIntegerField(blank=True, null=True)  # EXIF Orientation 태그 값
+    byte_size = models.BigIntegerField(blank=True, null=True)
+    # 업로드 시 함께 만든 파생 이미지 URL
+    thumbnail_url = models.URLField(max_length=500, blank=True, null=True)
+    preview_url = models.URLField(max_length=500, blank=True, null=True)  # WebP 미리보기
+    upload_batch = models.UUIDField(blank=True, null=True, db_index=True)  # 일괄 업로드로 함께 생성된 이미지 묶음
+    upload_key = models.CharField(max_length=300, blank=True, null=True)  # Presigned POST로 직접 업로드할 S3 키 (업로드 확인 시 사용)
+
+    METADATA_FIELDS = ['width', 'height', 'format', 'mode', 'orientation', 'byte_size']
+    RENDITION_FIELDS = ['thumbnail_url', 'preview_url']
+
+    @classmethod
+    def find_uploaded_duplicate(cls, content_hash, exclude_id=None):
+        # 같은 내용으로 이미 S3 업로드가 끝난 이미지를 찾음
+        if not content_hash:
+            return None
+        duplicates = cls.objects.filter(content_hash=content_hash).exclude(image_url__isnull=True).exclude(image_url='')
+        if exclude_id is not None:
+            duplicates = duplicates.exclude(id=exclude_id)
+        return duplicates.first()
+
+    @classmethod
+    def find_uploaded_duplicates(cls, content_hashes):
+        # 여러 해시에 대해 한 번의 쿼리로 {해시: 업로드가 끝난 이미지}를 만듦
+        duplicates = {}
+        queryset = cls.objects.filter(content_hash__in=set(content_hashes)).exclude(image_url__isnull=True).exclude(image_url='')
+        for image in queryset:
+            duplicates.setdefault(image.content_hash, image)
+        return duplicates
+
+    def copy_metadata_from(self, other):
+        # 같은 내용의 이미지이므로 메타데이터와 파생 이미지를 그대로 공유
+        for field in self.METADATA_FIELDS + self.RENDITION_FIELDS:
+            setattr(self, field, getattr(other, field))
+
+    def source_file_info(self):
+        # 외부 API로 원본을 보낼 때 사용할 (파일 이름, MIME 타입), 포맷을 모르면 기존처럼 JPEG로 취급
+        extension, content_type = FORMAT_FILE_INFO.get(self.format, ('jpg', 'image/jpeg'))
+        return f'image.{extension}', content_type
 
     def __str__(self):
         return f"Image {self.id} by User {self.user.nickname}"
@@ -0,0 +1,95 @@
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from PIL import Image as PILImage, ImageOps
+from core import storage
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 원본과 함께 저장하는 파생 이미지(썸네일/미리보기) 정의
+# 이름: (최대 크기, PIL 포맷, 품질, 파일 확장자, MIME 타입)
+RENDITIONS = {
+    'thumbnail': ((256, 256), 'JPEG', 80, 'jpg', 'image/jpeg'),
+    'preview': ((1024, 1024), 'WEBP', 80, 'webp', 'image/webp'),
+}
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # 프로세스(워커)마다 하나의 제한된 크기의 프로세스 풀을 사용
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=settings.RENDITION_POOL_SIZE)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def render(data, max_size, image_format, quality):
+    """
+    원본 바이트를 max_size 안에 들어오도록 줄여서 지정한 포맷으로 인코딩합니다.
+    (프로세스 풀에서 실행되므로 모듈 최상위 함수로 둠)
+    """
+    with PILImage.open(io.BytesIO(data)) as pil_image:
+        pil_image = ImageOps.exif_transpose(pil_image)
+        if image_format == 'JPEG' and pil_image.mode != 'RGB':
+            pil_image = pil_image.convert('RGB')
+        elif pil_image.mode not in ('RGB', 'RGBA'):
+            pil_image = pil_image.convert('RGBA')
+        pil_image.thumbnail(max_size)
+        output = io.BytesIO()
+        pil_image.save(output, format=image_format, quality=quality, optimize=True)
+        return output.getvalue()
+
+
+def _render_inline(data):
+    return {
+        name: render(data, max_size, image_format, quality)
+        for name, (max_size, image_format, quality, _, _) in RENDITIONS.items()
+    }
+
+
+def build_renditions(data, inline=False):
+    """
+    모든 파생 이미지를 프로세스 풀에서 병렬로 인코딩해서 {이름: 바이트}로 반환합니다.
+    inline이 True이면 (이미 CPU 전용 prefork 워커 안이면) 현재 프로세스에서 인코딩합니다.
+    """
+    # Celery prefork 자식처럼 데몬 프로세스는 자식 프로세스를 만들 수 없으므로 현재 프로세스에서 인코딩
+    if inline or multiprocessing.current_process().daemon:
+        return _render_inline(data)
+    try:
+        pool = _get_pool()
+        futures = {
+            name: pool.submit(render, data, max_size, image_format, quality)
+            for name, (max_size, image_format, quality, _, _) in RENDITIONS.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+    except (OSError, RuntimeError, AssertionError) as e:
+        # 프로세스 풀을 쓸 수 없는 환경이면 현재 프로세스에서 인코딩
+        logger.warning("Rendition pool unavailable, rendering inline: %s", e)
+        return _render_inline(data)
+
+
+def upload_renditions(data, base_name, inline=False):
+    """
+    파생 이미지를 만들어 S3에 업로드하고 {'thumbnail_url': ..., 'preview_url': ...}를 반환합니다.
+    실패해도 원본 처리는 계속되도록 예외를 올리지 않고 업로드된 것만 반환합니다.
+    """
+    urls = {}
+    try:
+        rendered = build_renditions(data, inline=inline)
+        for name, content in rendered.items():
+            _, _, _, extension, content_type = RENDITIONS[name]
+            file_name = f"{os.path.splitext(base_name)[0]}_{name}.{extension}"
+            urls[f'{name}_url'] = storage.upload_fileobj(io.BytesIO(content), file_name, content_type)
+    except Exception as e:
+        logger.error("Failed to create renditions for %s: %s", base_name, e)
+    return urls
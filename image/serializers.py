@@ -1,9 +1,15 @@
 from rest_framework import serializers
-from .models import Image
+from django.conf import settings
+from .models import Image, User
 import logging
 
 logger = logging.getLogger(__name__)
 
+def validate_image_file_name(value):
+    if not value.name.lower().endswith(('png', 'jpg', 'jpeg', 'gif')):
+        raise serializers.ValidationError('유효하지 않은 파일 형식입니다. PNG, JPG, JPEG 또는 GIF 파일을 업로드하세요.')
+    return value
+
 class ImageSerializer(serializers.ModelSerializer):
     file = serializers.ImageField(write_only=True)
     user_id = serializers.IntegerField(write_only=True)
@@ -18,9 +24,7 @@ class ImageSerializer(serializers.ModelSerializer):
         파일의 유효성을 검사합니다.
         """
         logger.debug("Uploaded file: %s", value.name)
-        if not value.name.lower().endswith(('png', 'jpg', 'jpeg', 'gif')):
-            raise serializers.ValidationError('유효하지 않은 파일 형식입니다. PNG, JPG, JPEG 또는 GIF 파일을 업로드하세요.')
-        return value
+        return validate_image_file_name(value)
 
     def create(self, validated_data):
         # user_id 필드를 user 필드로 변환
@@ -31,8 +35,35 @@ class ImageSerializer(serializers.ModelSerializer):
 
         return super().create(validated_data)
 
+class ImageBulkUploadSerializer(serializers.Serializer):
+    files = serializers.ListField(
+        child=serializers.ImageField(validators=[validate_image_file_name]),
+        allow_empty=False,
+        max_length=settings.IMAGE_BULK_MAX_FILES,
+    )
+    user_id = serializers.IntegerField()
+
+    def validate_user_id(self, value):
+        if not User.objects.filter(id=value).exists():
+            raise serializers.ValidationError('사용자를 찾을 수 없습니다.')
+        return value
+
+class ImagePresignedUploadSerializer(serializers.Serializer):
+    user_id = serializers.IntegerField()
+    file_name = serializers.CharField(max_length=200)
+    content_type = serializers.ChoiceField(choices=['image/png', 'image/jpeg', 'image/gif'])
+
+    def validate_file_name(self, value):
+        """
+        파일 이름의 확장자를 검사합니다.
+        """
+        if not value.lower().endswith(('png', 'jpg', 'jpeg', 'gif')):
+            raise serializers.ValidationError('유효하지 않은 파일 형식입니다. PNG, JPG, JPEG 또는 GIF 파일을 업로드하세요.')
+        # S3 키에 경로 구분자가 들어가지 않도록 파일 이름만 사용
+        return value.replace('/', '_').replace('\\', '_')
+
 # 새로운 시리얼라이저 정의
 class ImageDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Image
-        fields = ['id', 'image_url']
+        fields = ['id', 'image_url', 'thumbnail_url', 'preview_url', 'width', 'height', 'format', 'mode', 'orientation', 'byte_size']
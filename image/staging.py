@@ -0,0 +1,214 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import stat
+import time
+import uuid
+from django.conf import settings
+from prometheus_client import Counter, Gauge
+import redis
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# 웹 서버가 받은 업로드 파일을 Celery 워커에 넘기기 전 잠시 보관하는 스테이징 저장소
+# 브로커(RabbitMQ)에는 파일 내용 대신 짧은 참조값(ref)만 전달된다
+
+REF_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+CHUNK_SIZE = 64 * 1024
+# 웹 서버(root)와 워커(--uid=nobody)가 다른 사용자로 실행되므로 워커도 디렉토리의 파일을 읽고 지울 수 있게 함
+DIRECTORY_MODE = 0o777
+FILE_MODE = 0o644
+PIPELINE_CHUNKS = 16  # Redis 파이프라인 한 번에 보내는 최대 청크 수 (최대 1MB만 버퍼링)
+
+staged_files_total = Counter('image_staging_put_total', '스테이징 저장소에 저장된 업로드 파일 수')
+staged_bytes_total = Counter('image_staging_put_bytes_total', '스테이징 저장소에 저장된 업로드 바이트 수')
+
+
+class StagedUploadNotFound(Exception):
+    pass
+
+
+def _validate_ref(ref):
+    if not REF_PATTERN.match(ref):
+        raise StagedUploadNotFound(ref)
+    return ref
+
+
+class LocalStagingStore:
+    """
+    웹 서버와 워커가 공유하는 로컬 디스크 디렉토리에 업로드를 보관
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, ref):
+        return os.path.join(self.directory, _validate_ref(ref))
+
+    def _ensure_directory(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if stat.S_IMODE(os.stat(self.directory).st_mode) != DIRECTORY_MODE:
+            try:
+                os.chmod(self.directory, DIRECTORY_MODE)
+            except OSError as e:
+                logger.warning("Failed to set permissions of staging directory %s: %s", self.directory, e)
+
+    def put(self, file):
+        self._ensure_directory()
+        ref = uuid.uuid4().hex
+        path = self._path(ref)
+        tmp_path = f"{path}.part"
+        size = 0
+        digest = hashlib.sha256()
+        # 파일 전체를 메모리에 올리지 않고 청크 단위로 기록 (기록하면서 해시 계산)
+        with open(tmp_path, 'wb') as f:
+            for chunk in file.chunks(CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        os.chmod(tmp_path, FILE_MODE)
+        os.replace(tmp_path, path)
+        return ref, size, digest.hexdigest()
+
+    def open(self, ref):
+        try:
+            return open(self._path(ref), 'rb')
+        except FileNotFoundError:
+            raise StagedUploadNotFound(ref)
+
+    def delete(self, ref):
+        # 정리에 실패해도 작업은 계속되도록 예외를 올리지 않음 (남은 파일은 cleanup이 다시 시도)
+        try:
+            os.remove(self._path(ref))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Failed to delete staged upload %s: %s", ref, e)
+
+    def cleanup(self):
+        # TTL이 지난 파일(업로드 실패 등으로 남은 파일)을 삭제
+        if not os.path.isdir(self.directory):
+            return 0
+        deadline = time.time() - self.ttl
+        removed = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < deadline:
+                        os.remove(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.warning("Failed to remove expired staged upload %s: %s", entry.path, e)
+        return removed
+
+    def stats(self):
+        count = 0
+        total = 0
+        if not os.path.isdir(self.directory):
+            return count, total
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        count += 1
+                        total += entry.stat().st_size
+                except FileNotFoundError:
+                    continue
+        return count, total
+
+
+class RedisStagingStore:
+    """
+    Redis에 업로드를 보관 (만료는 Redis TTL에 맡김)
+    """
+
+    key_prefix = 'image_staging:'
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+
+    def _key(self, ref):
+        return f"{self.key_prefix}{_validate_ref(ref)}"
+
+    def put(self, file):
+        ref = uuid.uuid4().hex
+        key = self._key(ref)
+        size = 0
+        digest = hashlib.sha256()
+        # APPEND로 청크를 이어 붙이고 PIPELINE_CHUNKS개마다 전송해서 파이프라인에 전체 파일이 쌓이지 않도록 함
+        # (배치마다 TTL을 걸어서 중간에 실패해도 남은 조각은 만료됨)
+        pipe = self.client.pipeline()
+        buffered = 0
+        for chunk in file.chunks(CHUNK_SIZE):
+            pipe.append(key, chunk)
+            digest.update(chunk)
+            size += len(chunk)
+            buffered += 1
+            if buffered == PIPELINE_CHUNKS:
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+                buffered = 0
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+        return ref, size, digest.hexdigest()
+
+    def open(self, ref):
+        data = self.client.get(self._key(ref))
+        if data is None:
+            raise StagedUploadNotFound(ref)
+        return io.BytesIO(data)
+
+    def delete(self, ref):
+        self.client.delete(self._key(ref))
+
+    def cleanup(self):
+        return 0
+
+    def stats(self):
+        count = 0
+        total = 0
+        for key in self.client.scan_iter(match=f"{self.key_prefix}*", count=500):
+            count += 1
+            total += self.client.strlen(key)
+        return count, total
+
+
+_store = None
+
+
+def get_staging_store():
+    global _store
+    if _store is None:
+        if settings.IMAGE_STAGING_BACKEND == 'redis':
+            client = redis.StrictRedis.from_url(settings.IMAGE_STAGING_REDIS_URL)
+            _store = RedisStagingStore(client, settings.IMAGE_STAGING_TTL)
+        else:
+            _store = LocalStagingStore(settings.IMAGE_STAGING_DIR, settings.IMAGE_STAGING_TTL)
+    return _store
+
+
+def stage_upload(file):
+    # 스테이징 참조값과 파일 내용의 SHA-256 해시를 반환
+    ref, size, content_hash = get_staging_store().put(file)
+    staged_files_total.inc()
+    staged_bytes_total.inc(size)
+    logger.debug("Staged upload %s (%d bytes) as %s", file.name, size, ref)
+    return ref, content_hash
+
+
+def cleanup_expired():
+    return get_staging_store().cleanup()
+
+
+# 스크레이프 시점에 스테이징 저장소의 현재 크기를 계산
+staging_files = Gauge('image_staging_files', '스테이징 저장소에 남아있는 파일 수')
+staging_bytes = Gauge('image_staging_bytes', '스테이징 저장소에 남아있는 바이트 수')
+staging_files.set_function(lambda: get_staging_store().stats()[0])
+staging_bytes.set_function(lambda: get_staging_store().stats()[1])
@@ -1,47 +1,123 @@
 from celery import shared_task
-import boto3
+import os
 import uuid
-import base64
-from django.conf import settings
 import logging
-from io import BytesIO
+from core import jobs, storage
 from .models import Image
+from .staging import get_staging_store, cleanup_expired, StagedUploadNotFound
+from .metadata import extract_metadata
+from .renditions import upload_renditions
 import redis
 
 logger = logging.getLogger(__name__)
 redis_client = redis.StrictRedis(host='redis', port=6379, db=0)
 
 @shared_task
-def upload_image_to_s3(file_name, file_content, content_type, image_id):
+def upload_image_to_s3(file_name, staging_ref, content_type, image_id, job_id=None, job_total=1):
+    jobs.start(job_id)
+    try:
+        file_url, unique_filename = _upload_image(file_name, staging_ref, content_type, image_id)
+    except Exception as e:
+        _finish_job(job_id, job_total, image_id, None, str(e))
+        raise
+    if unique_filename:
+        # 파생 이미지 인코딩은 CPU 작업이므로 cpu 큐(prefork 워커)에서 이어서 처리하고 그쪽에서 작업을 완료함
+        create_image_renditions.delay(staging_ref, unique_filename, image_id, file_url, job_id=job_id, job_total=job_total)
+    else:
+        _finish_job(job_id, job_total, image_id, file_url, None if file_url else "이미지 업로드에 실패했습니다.")
+    return file_url
+
+
+@shared_task
+def create_image_renditions(staging_ref, unique_filename, image_id, file_url, job_id=None, job_total=1):
+    # 스테이징 파일로 썸네일/WebP 미리보기를 만들어 업로드 (실패해도 원본 업로드는 성공으로 처리)
+    store = get_staging_store()
+    try:
+        with store.open(staging_ref) as file_obj:
+            data = file_obj.read()
+    except StagedUploadNotFound:
+        logger.error(f"Staged upload {staging_ref} for Image {image_id} not found, skipping renditions")
+        data = None
+    if data is not None:
+        # prefork 워커 프로세스 안에서 바로 인코딩
+        urls = upload_renditions(data, unique_filename, inline=True)
+        if urls:
+            Image.objects.filter(id=image_id).update(**urls)
+        store.delete(staging_ref)
+    _finish_job(job_id, job_total, image_id, file_url, None)
+
+
+def _finish_job(job_id, job_total, image_id, file_url, error):
+    # 일괄 업로드는 파일 하나가 끝날 때마다 진행률만 올림
+    if job_total > 1:
+        jobs.advance(job_id, job_total, failed=error is not None)
+    elif error is None:
+        jobs.complete(job_id, {'image_id': image_id, 'image_url': file_url})
+    else:
+        jobs.fail(job_id, error)
+
+
+def _upload_image(file_name, staging_ref, content_type, image_id):
+    """
+    원본을 S3에 업로드하고 (URL, 파생 이미지를 만들 S3 파일 이름)을 반환합니다.
+    기존 객체를 재사용했거나 실패해서 파생 이미지를 만들 필요가 없으면 파일 이름은 None입니다.
+    """
     logger.info(f"Started uploading {file_name} to S3")
-    s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-    unique_filename = f"{uuid.uuid4()}_{file_name}"
-    file_content = base64.b64decode(file_content)  # base64로 인코딩된 파일 내용을 디코딩
-    file_obj = BytesIO(file_content)  # 파일 내용을 BytesIO 객체로 변환
-
-    # S3에 파일 업로드
-    s3.upload_fileobj(
-        file_obj,
-        settings.AWS_STORAGE_BUCKET_NAME,
-        unique_filename,
-        ExtraArgs={
-            "ContentType": content_type
-        }
-    )
-
-    # 업로드된 파일의 URL 생성
-    file_url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{unique_filename}"
-    logger.info(f"Finished uploading {file_name} to S3, URL: {file_url}")
+    store = get_staging_store()
 
-    # 데이터베이스 업데이트
     try:
         image_instance = Image.objects.get(id=image_id)
-        image_instance.image_url = file_url
-        image_instance.save()
-        logger.info(f"Updated Image {image_id} with URL: {file_url}")
-        # 작업 완료 후 Redis에서 임시 데이터 삭제
-        redis_client.delete(f'image_data_{image_id}')
     except Image.DoesNotExist:
         logger.error(f"Image with id {image_id} does not exist")
+        store.delete(staging_ref)
+        return None, None
 
-    return file_url
+    # 그 사이 같은 내용의 이미지가 업로드되었으면 S3 업로드를 생략하고 기존 객체를 재사용
+    duplicate = Image.find_uploaded_duplicate(image_instance.content_hash, exclude_id=image_id)
+    if duplicate:
+        store.delete(staging_ref)
+        image_instance.image_url = duplicate.image_url
+        image_instance.copy_metadata_from(duplicate)
+        image_instance.save(update_fields=['image_url', 'updated_at'] + Image.METADATA_FIELDS + Image.RENDITION_FIELDS)
+        logger.info(f"Reused S3 object of Image {duplicate.id} for Image {image_id}")
+        return duplicate.image_url, None
+
+    unique_filename = f"{uuid.uuid4()}_{file_name}"
+
+    # 스테이징 저장소에서 파일을 열어 S3에 업로드
+    try:
+        file_obj = store.open(staging_ref)
+    except StagedUploadNotFound:
+        logger.error(f"Staged upload {staging_ref} for Image {image_id} not found (expired?)")
+        return None, None
+
+    with file_obj:
+        # 업로드 전에 헤더만 읽어 메타데이터 추출
+        metadata = extract_metadata(file_obj)
+        metadata['byte_size'] = file_obj.seek(0, os.SEEK_END)
+        file_obj.seek(0)
+
+        file_url = storage.upload_fileobj(file_obj, unique_filename, content_type)
+    # 스테이징 파일은 파생 이미지 작업에서 삭제
+
+    logger.info(f"Finished uploading {file_name} to S3, URL: {file_url}")
+
+    # 데이터베이스 업데이트
+    image_instance.image_url = file_url
+    for field, value in metadata.items():
+        setattr(image_instance, field, value)
+    image_instance.save(update_fields=['image_url', 'updated_at'] + Image.METADATA_FIELDS)
+    logger.info(f"Updated Image {image_id} with URL: {file_url}")
+    # 작업 완료 후 Redis에서 임시 데이터 삭제
+    redis_client.delete(f'image_data_{image_id}')
+
+    return file_url, unique_filename
+
+
+@shared_task(ignore_result=True)
+def cleanup_staged_uploads():
+    # TTL이 지난 스테이징 파일 정리 (Celery beat에서 주기적으로 실행)
+    removed = cleanup_expired()
+    if removed:
+        logger.info(f"Removed {removed} expired staged uploads")
+    return removed
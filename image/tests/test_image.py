@@ -0,0 +1,87 @@
+import io
+import pytest
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image as PILImage
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from user.models import User
+from image.models import Image
+from image import tasks
+from image.staging import LocalStagingStore
+
+
+@pytest.mark.django_db
+class TestImageUploadAPI:
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create(nickname='testuser')
+
+    def test_presigned_upload_invalid_file_name(self): #Presigned 업로드 - 잘못된 파일 형식
+        response = self.client.post(reverse('image-presigned-upload'), {'user_id': self.user.id, 'file_name': 'test.txt', 'content_type': 'image/png'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
+
+    def test_confirm_nonexistent_presigned_upload(self): #존재하지 않는 이미지 업로드 확인
+        response = self.client.post(reverse('image-presigned-confirm', kwargs={'imageId': 999}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_bulk_upload_no_files(self): #파일 없이 일괄 업로드
+        response = self.client.post(reverse('upload-images-bulk'), {'user_id': self.user.id}, format='multipart')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'error' in response.data
+
+    def test_delete_image_enqueues_after_commit(self, django_capture_on_commit_callbacks): #S3 삭제는 행 삭제가 커밋된 뒤에 대기열로
+        image = Image.objects.create(user=self.user, image_url='https://bucket.s3.ap-northeast-2.amazonaws.com/a.png')
+        with mock.patch('core.storage.enqueue_delete') as enqueue_delete:
+            with django_capture_on_commit_callbacks() as callbacks:
+                response = self.client.delete(reverse('image-detail', kwargs={'imageId': image.id}))
+            enqueue_delete.assert_not_called()
+            for callback in callbacks:
+                callback()
+        assert response.status_code == status.HTTP_200_OK
+        assert not Image.objects.filter(id=image.id).exists()
+        enqueue_delete.assert_called_once_with([image.image_url, None, None])
+
+    def test_upload_same_content_reuses_s3_object(self, tmp_path): #같은 내용을 두 번 올리면 두 번째는 S3에 다시 올리지 않음
+        output = io.BytesIO()
+        PILImage.new('RGB', (8, 8), 'red').save(output, format='PNG')
+        content = output.getvalue()
+
+        def run_upload(file_name, staging_ref, content_type, image_id, job_id=None):
+            # Celery 대신 업로드 작업의 본문을 바로 실행
+            return tasks._upload_image(file_name, staging_ref, content_type, image_id)
+
+        s3_url = 'https://bucket.s3.ap-northeast-2.amazonaws.com/uuid_same.png'
+        with mock.patch('image.staging._store', LocalStagingStore(str(tmp_path), ttl=60)), \
+                mock.patch('image.views.jobs'), \
+                mock.patch('image.tasks.redis_client'), \
+                mock.patch('image.views.upload_image_to_s3') as upload_task, \
+                mock.patch('core.storage.upload_fileobj', return_value=s3_url) as upload_fileobj:
+            upload_task.delay.side_effect = run_upload
+            first = self.client.post(reverse('upload-image'), {
+                'file': SimpleUploadedFile('same.png', content, content_type='image/png'), 'user_id': self.user.id,
+            }, format='multipart')
+            second = self.client.post(reverse('upload-image'), {
+                'file': SimpleUploadedFile('same.png', content, content_type='image/png'), 'user_id': self.user.id,
+            }, format='multipart')
+
+        assert first.status_code == second.status_code == status.HTTP_202_ACCEPTED
+        assert upload_fileobj.call_count == 1
+        assert upload_task.delay.call_count == 1
+        assert Image.objects.get(id=second.data['image_id']).image_url == s3_url
+        assert Image.objects.get(id=first.data['image_id']).content_hash == Image.objects.get(id=second.data['image_id']).content_hash
+
+    def test_confirm_presigned_upload_uses_stored_key(self): #확인 요청이 늦게 와도 행에 저장된 S3 키로 확인
+        image = Image.objects.create(user=self.user, image_url='', upload_key='uuid_late.png')
+        client = mock.Mock()
+        client.head_object.return_value = {'ContentLength': 123}
+        client.get_object.return_value = {'Body': io.BytesIO(b'not-an-image')}
+        with mock.patch('core.storage.get_s3_client', return_value=client):
+            response = self.client.post(reverse('image-presigned-confirm', kwargs={'imageId': image.id}))
+        assert response.status_code == status.HTTP_200_OK
+        assert client.head_object.call_args.kwargs['Key'] == 'uuid_late.png'
+        image.refresh_from_db()
+        assert image.image_url.endswith('/uuid_late.png')
+        assert image.byte_size == 123
@@ -0,0 +1,28 @@
+import io
+from unittest import mock
+from PIL import Image as PILImage
+from image import renditions
+
+
+def make_png():
+    output = io.BytesIO()
+    PILImage.new('RGB', (2048, 1024), 'red').save(output, format='PNG')
+    return output.getvalue()
+
+
+def test_build_renditions_inline_in_daemon_process(): #데몬 프로세스(prefork 자식)에서는 풀 없이 바로 인코딩
+    with mock.patch('multiprocessing.current_process', return_value=mock.Mock(daemon=True)), \
+            mock.patch.object(renditions, '_get_pool') as get_pool:
+        rendered = renditions.build_renditions(make_png())
+    get_pool.assert_not_called()
+    assert set(rendered) == set(renditions.RENDITIONS)
+    with PILImage.open(io.BytesIO(rendered['thumbnail'])) as thumbnail:
+        assert thumbnail.format == 'JPEG'
+        assert max(thumbnail.size) == 256
+
+
+def test_build_renditions_falls_back_when_pool_fails(): #풀 생성이 AssertionError로 실패해도 인코딩은 계속
+    with mock.patch('multiprocessing.current_process', return_value=mock.Mock(daemon=False)), \
+            mock.patch.object(renditions, '_get_pool', side_effect=AssertionError('daemonic processes are not allowed to have children')):
+        rendered = renditions.build_renditions(make_png())
+    assert set(rendered) == set(renditions.RENDITIONS)
@@ -0,0 +1,72 @@
+import hashlib
+import os
+import stat
+import time
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from image.staging import CHUNK_SIZE, DIRECTORY_MODE, FILE_MODE, PIPELINE_CHUNKS, LocalStagingStore, RedisStagingStore, StagedUploadNotFound
+import pytest
+
+
+class TestLocalStagingStore:
+    def test_put_open_delete(self, tmp_path): #스테이징 저장 후 읽기/삭제
+        store = LocalStagingStore(str(tmp_path), ttl=60)
+        ref, size, content_hash = store.put(SimpleUploadedFile('test.png', b'image-bytes'))
+        assert size == len(b'image-bytes')
+        assert content_hash == hashlib.sha256(b'image-bytes').hexdigest()
+        with store.open(ref) as f:
+            assert f.read() == b'image-bytes'
+        assert store.stats() == (1, size)
+
+        store.delete(ref)
+        with pytest.raises(StagedUploadNotFound):
+            store.open(ref)
+
+    def test_cleanup_expired(self, tmp_path): #TTL이 지난 파일만 정리
+        store = LocalStagingStore(str(tmp_path), ttl=60)
+        old_ref, _, _ = store.put(SimpleUploadedFile('old.png', b'old'))
+        new_ref, _, _ = store.put(SimpleUploadedFile('new.png', b'new'))
+        past = time.time() - 120
+        os.utime(os.path.join(str(tmp_path), old_ref), (past, past))
+
+        assert store.cleanup() == 1
+        with pytest.raises(StagedUploadNotFound):
+            store.open(old_ref)
+        store.open(new_ref).close()
+
+    def test_put_makes_directory_writable(self, tmp_path): #다른 사용자로 실행되는 워커도 스테이징 파일을 지울 수 있음
+        directory = os.path.join(str(tmp_path), 'staging')
+        store = LocalStagingStore(directory, ttl=60)
+        ref, _, _ = store.put(SimpleUploadedFile('test.png', b'image-bytes'))
+        assert stat.S_IMODE(os.stat(directory).st_mode) == DIRECTORY_MODE
+        assert stat.S_IMODE(os.stat(os.path.join(directory, ref)).st_mode) == FILE_MODE
+
+    def test_delete_ignores_permission_error(self, tmp_path): #삭제 권한이 없어도 예외를 올리지 않음
+        store = LocalStagingStore(str(tmp_path), ttl=60)
+        ref, _, _ = store.put(SimpleUploadedFile('test.png', b'image-bytes'))
+        with mock.patch('image.staging.os.remove', side_effect=PermissionError('Operation not permitted')):
+            store.delete(ref)
+            past = time.time() - 120
+            os.utime(os.path.join(str(tmp_path), ref), (past, past))
+            assert store.cleanup() == 0
+
+    def test_invalid_ref(self, tmp_path): #경로 조작 방지
+        store = LocalStagingStore(str(tmp_path), ttl=60)
+        with pytest.raises(StagedUploadNotFound):
+            store.open('../../etc/passwd')
+
+
+class TestRedisStagingStore:
+    def test_put_executes_in_batches(self): #파이프라인은 PIPELINE_CHUNKS개 청크마다 전송
+        client = mock.Mock()
+        store = RedisStagingStore(client, ttl=60)
+        content = b'x' * (CHUNK_SIZE * (PIPELINE_CHUNKS * 2 + 1))
+        # 메모리 업로드 파일은 chunks()가 크기를 무시하므로 CHUNK_SIZE 단위로 나눠주는 파일을 사용
+        file = mock.Mock()
+        file.chunks.side_effect = lambda chunk_size: (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+        ref, size, content_hash = store.put(file)
+        pipe = client.pipeline.return_value
+        assert size == len(content)
+        assert content_hash == hashlib.sha256(content).hexdigest()
+        assert pipe.append.call_count == PIPELINE_CHUNKS * 2 + 1
+        assert pipe.execute.call_count == 3
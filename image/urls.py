@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import upload_image, image_manage
+from .views import upload_image, upload_images_bulk, image_manage, create_presigned_upload, confirm_presigned_upload
 
 urlpatterns = [
     path('images/', upload_image, name='upload-image'),  # 이미지 업로드 엔드포인트
+    path('images/bulk/', upload_images_bulk, name='upload-images-bulk'),  # 이미지 일괄 업로드 엔드포인트
+    path('images/presigned/', create_presigned_upload, name='image-presigned-upload'),  # S3 직접 업로드 URL 발급 엔드포인트
+    path('images/<int:imageId>/confirm/', confirm_presigned_upload, name='image-presigned-confirm'),  # S3 직접 업로드 확인 엔드포인트
     path('images/<int:imageId>/', image_manage, name='image-detail'),  # 이미지 조회 및 삭제 엔드포인트
 ]
\ No newline at end of file
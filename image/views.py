@@ -3,17 +3,27 @@ from rest_framework import status, serializers
 from rest_framework.decorators import api_view, parser_classes
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-import boto3
+from celery import group
+import io
+import uuid
+from botocore.exceptions import ClientError
 from django.conf import settings
+from django.db import transaction
+from drf_yasg import openapi
 import logging
-import base64
-from .models import Image
-from .serializers import ImageSerializer, ImageDetailSerializer
+from .models import Image, User
+from .serializers import ImageSerializer, ImageDetailSerializer, ImageBulkUploadSerializer, ImagePresignedUploadSerializer
 from .tasks import upload_image_to_s3
+from .staging import stage_upload, get_staging_store
+from .metadata import extract_metadata
+from core import jobs, storage
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
+# Presigned 업로드 확인 시 메타데이터 추출을 위해 내려받는 앞부분 크기
+METADATA_HEADER_BYTES = 64 * 1024
+
 # Swagger를 사용하여 이미지 업로드 API 문서화
 @swagger_auto_schema(
     method='post',
@@ -48,22 +58,232 @@ def upload_image(request, *args, **kwargs):
     file = request.FILES['file']
     user_id = request.data.get('user_id')
     content_type = file.content_type  # 파일의 content_type을 가져옴
-    file_content = base64.b64encode(file.read()).decode('utf-8')  # 파일 내용을 base64로 인코딩하여 전달
+    staging_ref, content_hash = stage_upload(file)  # 파일 내용은 스테이징 저장소에 두고 참조값만 전달
+
+    # 같은 내용의 이미지가 이미 S3에 있으면 업로드 없이 기존 객체를 재사용
+    duplicate = Image.find_uploaded_duplicate(content_hash)
+    if duplicate:
+        get_staging_store().delete(staging_ref)
+        image_instance = Image(user_id=user_id, image_url=duplicate.image_url, content_hash=content_hash)
+        image_instance.copy_metadata_from(duplicate)
+        image_instance.save()
+        logger.info(f"Reused S3 object of Image {duplicate.id} for Image {image_instance.id}")
+        return Response({
+            "success": "이미지가 업로드 중입니다. 업로드가 완료되면 URL이 업데이트됩니다.",
+            "image_id": image_instance.id  # image_id 반환
+        }, status=status.HTTP_202_ACCEPTED)
 
     # 이미지 인스턴스 생성
-    image_instance = Image.objects.create(user_id=user_id, image_url='')
+    image_instance = Image.objects.create(user_id=user_id, image_url='', content_hash=content_hash)
 
     # 비동기로 S3 업로드
     logger.info(f"Calling Celery task for uploading file: {file.name}")
     # Celery 태스크 호출
-    result = upload_image_to_s3.delay(file.name, file_content, content_type, image_instance.id)
+    job_id = jobs.create('image_upload', image_id=image_instance.id)
+    result = upload_image_to_s3.delay(file.name, staging_ref, content_type, image_instance.id, job_id=job_id)
     logger.info(f"Celery task called with ID: {result.id}")
 
     return Response({
         "success": "이미지가 업로드 중입니다. 업로드가 완료되면 URL이 업데이트됩니다.",
-        "image_id": image_instance.id  # image_id 반환
+        "image_id": image_instance.id,  # image_id 반환
+        "job_id": job_id  # 업로드 진행 상태 조회용
     }, status=status.HTTP_202_ACCEPTED)
 
+# Swagger를 사용하여 이미지 일괄 업로드 API 문서화
+@swagger_auto_schema(
+    method='post',
+    operation_id='이미지 일괄 업로드',
+    operation_description='여러 이미지를 한 번에 업로드합니다. (files 필드를 여러 번 전송)',
+    tags=['Images'],
+    manual_parameters=[
+        openapi.Parameter('files', openapi.IN_FORM, type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_FILE),
+                          collection_format='multi', required=True, description='업로드할 이미지 파일들'),
+        openapi.Parameter('user_id', openapi.IN_FORM, type=openapi.TYPE_INTEGER, required=True, description='User ID'),
+    ],
+    responses={
+        202: openapi.Response('업로드 시작', openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'image_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Items(type=openapi.TYPE_INTEGER)),
+                'job_id': openapi.Schema(type=openapi.TYPE_STRING, description='업로드 진행 상태 조회용 작업 ID'),
+            }
+        )),
+        400: "Bad request. Make sure to provide valid images.",
+    }
+)
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def upload_images_bulk(request):
+    """
+    이미지 일괄 업로드
+    """
+    serializer = ImageBulkUploadSerializer(data=request.data)
+    try:
+        serializer.is_valid(raise_exception=True)
+    except serializers.ValidationError as e:
+        logger.error("Validation error: %s", e)
+        return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+    files = serializer.validated_data['files']
+    user_id = serializer.validated_data['user_id']
+
+    # 모든 파일을 스테이징 저장소에 두고 해시를 계산
+    staged = [(file, *stage_upload(file)) for file in files]
+    duplicates = Image.find_uploaded_duplicates(content_hash for _, _, content_hash in staged)
+
+    # 이미지 인스턴스를 한 번의 INSERT로 생성
+    upload_batch = uuid.uuid4()
+    images = []
+    for file, staging_ref, content_hash in staged:
+        image_instance = Image(user_id=user_id, image_url='', content_hash=content_hash, upload_batch=upload_batch)
+        duplicate = duplicates.get(content_hash)
+        if duplicate:
+            # 같은 내용의 이미지가 이미 S3에 있으면 업로드 없이 재사용
+            get_staging_store().delete(staging_ref)
+            image_instance.image_url = duplicate.image_url
+            image_instance.copy_metadata_from(duplicate)
+        images.append(image_instance)
+    Image.objects.bulk_create(images)
+
+    # MySQL은 bulk_create 후 id를 돌려주지 않으므로 같은 묶음을 생성 순서대로 다시 조회
+    if images and images[0].id is None:
+        image_ids = list(Image.objects.filter(upload_batch=upload_batch).order_by('id').values_list('id', flat=True))
+    else:
+        image_ids = [image.id for image in images]
+
+    # 업로드가 필요한 파일만 하나의 그룹 작업으로 병렬 업로드
+    pending = [
+        (file, staging_ref, image_id)
+        for (file, staging_ref, content_hash), image_id in zip(staged, image_ids)
+        if content_hash not in duplicates
+    ]
+    job_id = None
+    if pending:
+        # 묶음 전체의 진행률은 하나의 작업으로 조회
+        job_id = jobs.create('image_bulk_upload', image_ids=image_ids)
+        uploads = [
+            upload_image_to_s3.s(file.name, staging_ref, file.content_type, image_id, job_id=job_id, job_total=len(pending))
+            for file, staging_ref, image_id in pending
+        ]
+        result = group(uploads).apply_async()
+        logger.info(f"Celery group called with ID: {result.id} for {len(uploads)} files")
+
+    return Response({
+        "success": "이미지가 업로드 중입니다. 업로드가 완료되면 URL이 업데이트됩니다.",
+        "image_ids": image_ids,
+        "job_id": job_id  # 업로드가 필요한 파일이 없으면 null
+    }, status=status.HTTP_202_ACCEPTED)
+
+# Swagger를 사용하여 Presigned 업로드 API 문서화
+@swagger_auto_schema(
+    method='post',
+    operation_id='이미지 업로드 URL 발급',
+    operation_description='S3에 직접 업로드할 수 있는 Presigned POST를 발급합니다. 업로드 후 확인 API를 호출해야 합니다.',
+    tags=['Images'],
+    request_body=ImagePresignedUploadSerializer,
+    responses={
+        201: openapi.Response('Presigned POST 발급 성공', openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'image_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='이미지 ID'),
+                'upload': openapi.Schema(type=openapi.TYPE_OBJECT, description='S3 업로드 URL과 폼 필드'),
+            }
+        )),
+        400: "Bad request.",
+        404: "User not found.",
+    }
+)
+@api_view(['POST'])
+def create_presigned_upload(request):
+    """
+    Presigned POST 발급 (이미지 바이트는 서버를 거치지 않고 S3로 직접 업로드)
+    """
+    serializer = ImagePresignedUploadSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    user_id = serializer.validated_data['user_id']
+    file_name = serializer.validated_data['file_name']
+    content_type = serializer.validated_data['content_type']
+
+    if not User.objects.filter(id=user_id).exists():
+        return Response({"error": "사용자 없음"}, status=status.HTTP_404_NOT_FOUND)
+
+    # 이미지 인스턴스 생성 (URL은 업로드 확인 후 업데이트, 확인 단계에서 사용할 S3 키는 행에 저장)
+    file_key = f"{uuid.uuid4()}_{file_name}"
+    image_instance = Image.objects.create(user_id=user_id, image_url='', upload_key=file_key)
+
+    presigned_post = storage.get_s3_client().generate_presigned_post(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=file_key,
+        Fields={'Content-Type': content_type},
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, settings.IMAGE_UPLOAD_MAX_SIZE],
+        ],
+        ExpiresIn=settings.IMAGE_PRESIGNED_EXPIRES,
+    )
+
+    return Response({
+        "image_id": image_instance.id,
+        "upload": presigned_post,
+    }, status=status.HTTP_201_CREATED)
+
+# Swagger를 사용하여 Presigned 업로드 확인 API 문서화
+@swagger_auto_schema(
+    method='post',
+    operation_id='이미지 업로드 확인',
+    operation_description='Presigned POST로 업로드한 이미지를 확인하고 URL을 저장합니다.',
+    tags=['Images'],
+    responses={
+        200: ImageDetailSerializer,
+        400: "The object has not been uploaded yet.",
+        404: "Image not found.",
+    }
+)
+@api_view(['POST'])
+def confirm_presigned_upload(request, imageId):
+    """
+    Presigned 업로드 확인
+    """
+    try:
+        image = Image.objects.get(id=imageId)
+    except Image.DoesNotExist:
+        return Response({"error": "해당 이미지를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+
+    if image.image_url:
+        # 이미 확인된 업로드
+        serializer = ImageDetailSerializer(image)
+        return Response({"success": "이미지가 성공적으로 업로드되었습니다.", "data": serializer.data}, status=status.HTTP_200_OK)
+
+    file_key = image.upload_key
+    if not file_key:
+        return Response({"error": "업로드 URL이 발급되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # HEAD 요청으로 S3에 객체가 올라왔는지 확인
+    s3 = storage.get_s3_client()
+    try:
+        head = s3.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key)
+    except ClientError as e:
+        logger.info("Presigned upload for Image %s not found: %s", image.id, e)
+        return Response({"error": "아직 업로드가 완료되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+    # 이미지 헤더가 들어있는 앞부분만 내려받아 메타데이터 추출
+    try:
+        header = s3.get_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key,
+                               Range=f'bytes=0-{METADATA_HEADER_BYTES - 1}')['Body'].read()
+        for field, value in extract_metadata(io.BytesIO(header)).items():
+            setattr(image, field, value)
+    except ClientError as e:
+        logger.warning("Failed to read header of presigned upload for Image %s: %s", image.id, e)
+    image.byte_size = head['ContentLength']
+
+    image.image_url = storage.object_url(file_key)
+    image.save()
+
+    serializer = ImageDetailSerializer(image)
+    return Response({"success": "이미지가 성공적으로 업로드되었습니다.", "data": serializer.data}, status=status.HTTP_200_OK)
+
 # Swagger를 사용하여 이미지 조회 및 삭제 API 문서화
 @swagger_auto_schema(
     method='get',
@@ -104,12 +324,13 @@ def image_manage(request, imageId):
         return Response({"success": "이미지가 성공적으로 조회되었습니다.", "data": serializer.data}, status=status.HTTP_200_OK)
 
     elif request.method == 'DELETE':
-        # S3에서 파일 삭제
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        file_key = image.image_url.split('/')[-1]
-        s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key)
+        # S3에서 파일 삭제 (중복 제거로 다른 이미지가 같은 객체를 쓰고 있으면 유지)
+        shared = Image.objects.filter(image_url=image.image_url).exclude(id=image.id).exists()
+        urls = [image.image_url, image.thumbnail_url, image.preview_url] if image.image_url and not shared else []
 
-        # 데이터베이스에서 이미지 삭제
-        image.delete()
+        # 데이터베이스에서 이미지 삭제 (S3 삭제는 행 삭제가 커밋된 뒤에 대기열에 넣음)
+        with transaction.atomic():
+            image.delete()
+            transaction.on_commit(lambda: storage.enqueue_delete(urls), robust=True)
         # 성공적으로 삭제되었음을 나타내는 200 응답
         return Response({"success": "이미지가 성공적으로 삭제되었습니다."}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -8,12 +9,10 @@ from background.models import Background
 from recreated_background.models import RecreatedBackground
 from .models import ImageResizing
 from .serializers import BackgroundImageResizingSerializer, RecreatedBackgroundImageResizingSerializer
-import requests
 import io
 import uuid
-import boto3
 from PIL import Image as PILImage
-from django.conf import settings
+from core import storage, source_cache
 import logging
 
 # 로깅 설정
@@ -51,12 +50,12 @@ def resize_background_image_view(request):
         # 배경 이미지 객체를 가져옴
         background = get_object_or_404(Background, id=background_id)
         image_url = background.image_url
+        if not image_url:
+            return Response({"error": "이미지 생성이 아직 완료되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             # 이미지를 다운로드
-            image_response = requests.get(image_url)
-            image_response.raise_for_status()
-            image_file = io.BytesIO(image_response.content)
+            image_file = io.BytesIO(source_cache.fetch(image_url))
             pil_image = PILImage.open(image_file)
 
             # 이미지 리사이징
@@ -66,11 +65,8 @@ def resize_background_image_view(request):
             resized_image_bytes.seek(0)
 
             # S3에 업로드
-            s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
             unique_filename = f"{uuid.uuid4()}.png"
-            s3.upload_fileobj(resized_image_bytes, settings.AWS_STORAGE_BUCKET_NAME, unique_filename,
-                              ExtraArgs={'ContentType': 'image/png'})
-            resized_image_url = f"http://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{unique_filename}"
+            resized_image_url = storage.upload_fileobj(resized_image_bytes, unique_filename, 'image/png')
 
             # ImageResizing 객체 생성 및 저장
             image_resizing = ImageResizing.objects.create(
@@ -83,7 +79,7 @@ def resize_background_image_view(request):
             return Response({"resized_image_url": resized_image_url, "id": image_resizing.id},
                             status=status.HTTP_200_OK)
 
-        except requests.RequestException as e:
+        except source_cache.SourceFetchError as e:
             logger.error("Failed to download image: %s", e)
             return Response({"error": "Failed to download image"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
@@ -124,12 +120,12 @@ def resize_recreated_background_image_view(request):
         # 재생성된 배경 이미지 객체를 가져옴
         recreated_background = get_object_or_404(RecreatedBackground, id=recreated_background_id)
         image_url = recreated_background.image_url
+        if not image_url:
+            return Response({"error": "이미지 생성이 아직 완료되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             # 이미지를 다운로드
-            image_response = requests.get(image_url)
-            image_response.raise_for_status()
-            image_file = io.BytesIO(image_response.content)
+            image_file = io.BytesIO(source_cache.fetch(image_url))
             pil_image = PILImage.open(image_file)
 
             # 이미지 리사이징
@@ -139,11 +135,8 @@ def resize_recreated_background_image_view(request):
             resized_image_bytes.seek(0)
 
             # S3에 업로드
-            s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
             unique_filename = f"{uuid.uuid4()}.png"
-            s3.upload_fileobj(resized_image_bytes, settings.AWS_STORAGE_BUCKET_NAME, unique_filename,
-                              ExtraArgs={'ContentType': 'image/png'})
-            resized_image_url = f"http://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{unique_filename}"
+            resized_image_url = storage.upload_fileobj(resized_image_bytes, unique_filename, 'image/png')
 
             # ImageResizing 객체 생성 및 저장
             image_resizing = ImageResizing.objects.create(
@@ -156,7 +149,7 @@ def resize_recreated_background_image_view(request):
             return Response({"resized_image_url": resized_image_url, "id": image_resizing.id},
                             status=status.HTTP_200_OK)
 
-        except requests.RequestException as e:
+        except source_cache.SourceFetchError as e:
             logger.error("Failed to download image: %s", e)
             return Response({"error": "Failed to download image"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
@@ -201,17 +194,12 @@ def background_image_manage(request, background_image_id):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     elif request.method == 'DELETE':
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        file_key = image_resizing.image_url.split('/')[-1]
-        try:
-            # S3에서 파일 삭제
-            s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key)
-        except Exception as e:
-            logger.error("S3 파일 삭제 오류: %s", e)
-            return Response({"error": "S3 파일 삭제 오류", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        urls = [image_resizing.image_url]
 
-        # 이미지 리사이징 객체 삭제
-        image_resizing.delete()
+        # 이미지 리사이징 객체 삭제 (S3 삭제는 커밋된 뒤에 대기열에 넣고 바로 응답)
+        with transaction.atomic():
+            image_resizing.delete()
+            transaction.on_commit(lambda: storage.enqueue_delete(urls), robust=True)
         return Response({"message": "Image deleted successfully."}, status=status.HTTP_200_OK)
 
 
@@ -250,15 +238,10 @@ def recreated_background_image_manage(request, recreated_background_image_id):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     elif request.method == 'DELETE':
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        file_key = image_resizing.image_url.split('/')[-1]
-        try:
-            # S3에서 파일 삭제
-            s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key)
-        except Exception as e:
-            logger.error("S3 파일 삭제 오류: %s", e)
-            return Response({"error": "S3 파일 삭제 오류", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        urls = [image_resizing.image_url]
 
-        # 이미지 리사이징 객체 삭제
-        image_resizing.delete()
+        # 이미지 리사이징 객체 삭제 (S3 삭제는 커밋된 뒤에 대기열에 넣고 바로 응답)
+        with transaction.atomic():
+            image_resizing.delete()
+            transaction.on_commit(lambda: storage.enqueue_delete(urls), robust=True)
         return Response({"message": "Image deleted successfully."}, status=status.HTTP_200_OK)
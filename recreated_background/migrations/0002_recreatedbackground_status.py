@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recreated_background', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recreatedbackground',
+            name='image_url',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='recreatedbackground',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='recreatedbackground',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recreated_background', '0002_recreatedbackground_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recreatedbackground',
+            name='output_format',
+            field=models.CharField(default='png', max_length=10),
+        ),
+    ]
@@ -1,11 +1,23 @@
 from django.db import models
 from background.models import Background
 class RecreatedBackground(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     # background 필드는 재생성된 배경을 참조합니다.
     # Background 모델의 인스턴스를 외래 키로 가짐 -> 하지만 user_id와 image_id만 참조하고 나머지는 다 독립적이다!
     background = models.ForeignKey(Background, on_delete=models.CASCADE)
     concept_option = models.TextField(default='default_concept')
-    image_url = models.CharField(max_length=500)
+    image_url = models.CharField(max_length=500, null=True, blank=True)  # 생성이 끝나면 채워짐
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_COMPLETED)  # 비동기 재생성 진행 상태
+    error = models.TextField(null=True, blank=True)  # 재생성 실패 사유
+    output_format = models.CharField(max_length=10, default='png')  # 결과 이미지 인코딩 포맷 (png, webp, jpeg)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
@@ -18,11 +18,17 @@ class RecreatedBackgroundSerializer(serializers.ModelSerializer):
             'background',  # Background 객체와의 외래 키 관계
             'user_id',  # Background 객체와 연관된 사용자 ID
             'image_id',  # Background 객체와 연관된 이미지 ID
-            'image_url',  # 생성된 이미지 URL
+            'image_url',  # 생성된 이미지 URL (생성 중에는 null)
+            'status',  # 재생성 진행 상태 (pending, completed, failed)
+            'error',  # 실패 사유
+            'output_format',  # 결과 이미지 인코딩 포맷
         ]
         read_only_fields = [
             'id',
             'background',
             'user_id',
             'image_id',
+            'status',
+            'error',
+            'output_format',
         ]
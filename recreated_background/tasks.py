@@ -0,0 +1,49 @@
+from celery import shared_task
+from django.conf import settings
+from background.tasks import generate_output, output_filename
+from core import draph, encoding, jobs, resilience, storage
+from .models import RecreatedBackground
+import io
+import logging
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def recreate_background_task(self, recreated_background_id, output=None, job_id=None):
+    """
+    대기 중인 RecreatedBackground의 이미지를 생성해서 image_url과 상태를 갱신합니다.
+    """
+    recreated_background = RecreatedBackground.objects.select_related('background__image').get(id=recreated_background_id)
+    background = recreated_background.background
+    policy = output or encoding.get_policy('recreated_background', recreated_background.output_format)
+    data = {
+        "username": settings.DRAPHART_USER_NAME,
+        "gen_type": background.gen_type,
+        "output_w": background.output_w,
+        "output_h": background.output_h,
+        'concept_option': recreated_background.concept_option,
+    }
+
+    jobs.start(job_id)
+    try:
+        output_data = generate_output(background.image, data, policy)
+        jobs.update(job_id, progress=80)
+        s3_url = storage.upload_fileobj(io.BytesIO(output_data), output_filename(policy), encoding.content_type(policy))
+    except Exception as e:
+        if isinstance(e, draph.DraphError) and e.retryable:
+            resilience.retry_task(self, 'draph', e)
+        logger.error("Error in recreate_background_task: %s", e)
+        recreated_background.status = RecreatedBackground.STATUS_FAILED
+        recreated_background.error = str(e)
+        recreated_background.save(update_fields=['status', 'error', 'updated_at'])
+        jobs.fail(job_id, e)
+        return {"recreated_background_id": recreated_background.id, "error": str(e)}
+
+    recreated_background.image_url = s3_url
+    recreated_background.status = RecreatedBackground.STATUS_COMPLETED
+    recreated_background.save(update_fields=['image_url', 'status', 'updated_at'])
+    result = {"recreated_background_id": recreated_background.id, "image_url": s3_url}
+    jobs.complete(job_id, result)
+    return result
@@ -35,8 +35,9 @@ class TestRecreatedBackgroundAPI:
             }
         }
         response = self.client.post(self.recreate_url, payload, format='json')
-        assert response.status_code == status.HTTP_201_CREATED
-        assert 'image_url' in response.data
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert response.data['status'] == RecreatedBackground.STATUS_PENDING
+        assert 'task_id' in response.data
 
     def test_get_recreated_background(self): #재생성된 배경 이미지 조회 테스트
         recreated_background = RecreatedBackground.objects.create(
@@ -5,22 +5,18 @@ from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from .models import RecreatedBackground, Background
 from .serializers import RecreatedBackgroundSerializer
-import requests
-import io
-import uuid
-import base64
-import boto3
-from PIL import Image as PILImage
+from .tasks import recreate_background_task
 import json
 import logging
-from django.conf import settings
+from django.db import transaction
+from core import encoding, jobs, storage, translation
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
 @swagger_auto_schema(method='post',
     operation_id='AI 배경 이미지 재생성',
-    operation_description='AI 배경 이미지를 재생성합니다.',
+    operation_description='AI 배경 이미지를 재생성합니다. 생성은 비동기로 처리되며 조회 API의 status로 완료 여부를 확인합니다.',
     tags=['Recreated Background'],
     request_body=openapi.Schema(
         type=openapi.TYPE_OBJECT,
@@ -30,11 +26,13 @@ logger = logging.getLogger(__name__)
                 'theme': openapi.Schema(type=openapi.TYPE_STRING, description='Theme'),
                 'num_results': openapi.Schema(type=openapi.TYPE_INTEGER, description='Number of Results', minimum=1, maximum=4)
             }),
+            'output_format': openapi.Schema(type=openapi.TYPE_STRING, description='결과 이미지 포맷 (기본값은 서버 설정)', enum=list(encoding.FORMATS)),
+            'output_quality': openapi.Schema(type=openapi.TYPE_INTEGER, description='WebP/JPEG 품질', minimum=1, maximum=100),
         },
         required=['concept_option']
     ),
     responses={
-        201: openapi.Response('Recreated Image Successfully', RecreatedBackgroundSerializer),
+        202: openapi.Response('재생성 요청 접수 (status가 pending인 RecreatedBackground 반환)', RecreatedBackgroundSerializer),
         400: 'Bad Request',
         404: 'Not Found',
         500: 'Internal Server Error'
@@ -59,77 +57,30 @@ def recreate_background_view(request):
     except Background.DoesNotExist:
         return Response({"error": "Background not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    user = background.user
-    image = background.image
+    if not background.image.image_url:
+        return Response({"error": "이미지 업로드가 아직 완료되지 않았습니다."}, status=status.HTTP_400_BAD_REQUEST)
 
-    # 이미지 테이블에 있는 사용자가 업로드한 사진의 URL을 다운로드
-    image_url = image.image_url
     try:
-        image_response = requests.get(image_url)
-        image_response.raise_for_status()
-        image_file = io.BytesIO(image_response.content)
-        logger.debug("Downloaded image from URL: %s", image_url)
-    except requests.RequestException as e:
-        logger.error("Failed to download image: %s", e)
-        return Response({"error": "Failed to download image"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        output = encoding.get_policy('recreated_background', request.data.get('output_format'), request.data.get('output_quality'))
+    except encoding.OutputFormatError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # API 호출 준비
-    url = "https://api.draph.art/v1/generate/"
-    headers = {'Authorization': f'Bearer {settings.DRAPHART_API_KEY}'}
+    # 사용자의 입력을 영어로 번역 (용어표에 있는 카테고리/테마는 네트워크 없이 번역)
+    concept_option = translation.translate_concept_option(concept_option)
 
-    # 파일 객체에 파일 이름을 수동으로 추가
-    files = {
-        'image': ('image.jpg', image_file, 'image/jpeg')
-    }
-
-    # 요청 데이터 구성
-    data = {
-        "username": settings.DRAPHART_USER_NAME,
-        "gen_type": background.gen_type,
-        "output_w": background.output_w,
-        "output_h": background.output_h,
-        'concept_option': json.dumps(concept_option),
-    }
-
-    # API 호출
-    response = requests.post(url, headers=headers, data=data, files=files)
-
-    if response.status_code != 200:
-        logger.debug("AI 이미지 생성 실패: %s", response.text)
-        return Response({"error": "AI 이미지 생성 실패", "details": response.text}, status=status.HTTP_400_BAD_REQUEST)
-
-    response_data = response.content
-
-    try:
-        # base64 이미지를 디코딩하고 처리
-        image_data = base64.b64decode(response_data)
-        image_bytes = io.BytesIO(image_data)
-        pil_image = PILImage.open(image_bytes)
-        pil_image = pil_image.convert('RGB')
-        png_image_bytes = io.BytesIO()
-        pil_image.save(png_image_bytes, format='PNG')
-        png_image_bytes.seek(0)
-
-        # S3에 업로드
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        unique_filename = f"{uuid.uuid4()}.png"
-        s3.upload_fileobj(png_image_bytes, settings.AWS_STORAGE_BUCKET_NAME, unique_filename, ExtraArgs={'ContentType': 'image/png'})
-        s3_url = f"http://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION_NAME}.amazonaws.com/{unique_filename}"
-
-    except Exception as e:
-        logger.error("Error uploading to S3: %s", e)
-        return Response({"error": "Failed to upload image to S3", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
-    # RecreatedBackground 모델에 저장
+    # 대기 상태의 행을 먼저 만들고 생성/업로드는 Celery 작업에서 처리
     recreated_background = RecreatedBackground.objects.create(
         background=background,
-        concept_option=concept_option,
-        image_url=s3_url,
+        concept_option=json.dumps(concept_option),
+        status=RecreatedBackground.STATUS_PENDING,
+        output_format=output['format'],
     )
+    job_id = jobs.create('background_recreation', recreated_background_id=recreated_background.id)
+    task = recreate_background_task.delay(recreated_background.id, output=output, job_id=job_id)
 
-    # 성공적으로 저장되었음을 클라이언트에게 반환
+    # 클라이언트는 작업 조회 API(long-polling) 또는 조회 API의 status로 완료 여부를 확인
     serializer = RecreatedBackgroundSerializer(recreated_background)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+    return Response({**serializer.data, "job_id": job_id, "task_id": task.id}, status=status.HTTP_202_ACCEPTED)
 
 @swagger_auto_schema(
     method='get',
@@ -165,15 +116,10 @@ def recreated_background_manage(request, recreated_backgroundId):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     elif request.method == 'DELETE':
-        s3 = boto3.client('s3', region_name=settings.AWS_S3_REGION_NAME)
-        file_key = recreated_background.image_url.split('/')[-1]
-        try:
-            # S3에서 파일 삭제
-            s3.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=file_key)
-        except Exception as e:
-            logger.error("S3 파일 삭제 오류: %s", e)
-            return Response({"error": "S3 파일 삭제 오류", "details": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        urls = [recreated_background.image_url]
 
-        # 재생성된 배경 이미지 객체 삭제
-        recreated_background.delete()
+        # 재생성된 배경 이미지 객체 삭제 (S3 삭제는 커밋된 뒤에 대기열에 넣고 바로 응답)
+        with transaction.atomic():
+            recreated_background.delete()
+            transaction.on_commit(lambda: storage.enqueue_delete(urls), robust=True)
         return Response({"message": "Image deleted successfully."}, status=status.HTTP_200_OK)
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('texttovideo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='texttovideo',
+            name='video_url',
+            field=models.CharField(blank=True, max_length=2048, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('uploading', 'Uploading'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='completed', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='fal_request_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='fal_status_url',
+            field=models.CharField(blank=True, max_length=2048, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='fal_response_url',
+            field=models.CharField(blank=True, max_length=2048, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='fal_cancel_url',
+            field=models.CharField(blank=True, max_length=2048, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='job_id',
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='texttovideo',
+            name='error',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -2,9 +2,30 @@ from django.db import models
 from user.models import User
 
 class TextToVideo(models.Model):
+    STATUS_PENDING = 'pending'  # fal에 제출 전
+    STATUS_PROCESSING = 'processing'  # 제출 후 생성 중 (poll_text_to_video_jobs가 상태 확인)
+    STATUS_UPLOADING = 'uploading'  # 생성이 끝나 S3로 옮기는 중
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, default=1)  # 기본 값을 1로 설정하여 초기 사용자 없음에 따른 오류 방지
     prompt = models.CharField(max_length=255)
-    video_url = models.CharField(max_length=2048)  # 최대 길이를 2048로 늘림
+    video_url = models.CharField(max_length=2048, blank=True, null=True)  # 최대 길이를 2048로 늘림, 생성이 끝나면 채워짐
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_COMPLETED, db_index=True)  # 비동기 생성 진행 상태
+    fal_request_id = models.CharField(max_length=100, blank=True, null=True)  # fal 큐 요청 ID
+    fal_status_url = models.CharField(max_length=2048, blank=True, null=True)  # fal 요청 상태 조회 URL
+    fal_response_url = models.CharField(max_length=2048, blank=True, null=True)  # fal 요청 결과 조회 URL
+    fal_cancel_url = models.CharField(max_length=2048, blank=True, null=True)
+    job_id = models.CharField(max_length=32, blank=True, null=True)  # core.jobs 진행 상태 ID
+    submitted_at = models.DateTimeField(blank=True, null=True)  # fal에 제출한 시각 (시간 초과 판단용)
+    error = models.TextField(blank=True, null=True)  # 생성 실패 사유
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
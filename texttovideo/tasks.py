@@ -0,0 +1,197 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from django_redis import get_redis_connection
+from .models import TextToVideo
+from core import jobs, resilience, storage, translation
+import langdetect
+import fal_client
+
+# 로거 설정
+logger = logging.getLogger(__name__)
+
+# 텍스트→비디오 생성은 video 앱과 같은 세 단계로 처리해서 요청/워커가 생성 시간 동안 기다리지 않음
+# 1. submit_text_to_video_task: 프롬프트를 번역하고 fal 큐에 제출 (processing)
+# 2. poll_text_to_video_jobs: beat가 주기적으로 실행해서 processing인 요청 전체의 상태를 한 번에 동시 조회
+# 3. finish_text_to_video_task: 끝난 요청의 결과를 받아 S3로 스트리밍 업로드 (completed)
+
+FAL_APPLICATION = "fal-ai/fast-svd/text-to-video"
+POLL_LOCK_KEY = 'text_to_video_poll_lock'
+
+# 락을 잡은 주기의 토큰일 때만 삭제 (만료 후 다른 주기가 잡은 락을 지우지 않도록)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _arguments(prompt):
+    return {
+        "prompt": prompt,
+        "motion_bucket_id": 127,
+        "cond_aug": 0.02,
+        "steps": 20,
+        "deep_cache": "none",
+        "fps": 10,
+        "negative_prompt": "unrealistic, saturated, high contrast, big nose, painting, drawing, sketch, cartoon, anime, manga, render, CG, 3d, watermark, signature, label",
+        "video_size": "landscape_16_9"
+    }
+
+
+def _handle(video):
+    # 저장해 둔 URL로 fal 요청 핸들을 다시 만듦 (fal_client 모듈이 쓰는 keep-alive 클라이언트를 공유)
+    return fal_client.SyncRequestHandle(
+        request_id=video.fal_request_id,
+        response_url=video.fal_response_url,
+        status_url=video.fal_status_url,
+        cancel_url=video.fal_cancel_url,
+        client=fal_client.sync_client._client,
+    )
+
+
+def _translate_prompt(prompt):
+    # 프롬프트의 언어를 감지하여 한국어일 경우 번역
+    try:
+        if langdetect.detect(prompt) == 'ko':
+            return translation.translate(prompt)
+    except langdetect.lang_detect_exception.LangDetectException:
+        pass
+    return prompt
+
+
+def _fail(video, error):
+    logger.error("TextToVideo %s generation failed: %s", video.id, error)
+    video.status = TextToVideo.STATUS_FAILED
+    video.error = str(error)
+    video.save(update_fields=['status', 'error', 'updated_at'])
+    jobs.fail(video.job_id, error)
+
+
+@shared_task
+def submit_text_to_video_task(text_to_video_id):
+    """
+    프롬프트를 번역해서 fal 큐에 제출하고 요청 URL들을 저장합니다. 결과 확인은 poll_text_to_video_jobs가 합니다.
+    """
+    video = TextToVideo.objects.get(id=text_to_video_id)
+    jobs.start(video.job_id)
+    try:
+        # fal 서킷이 열려 있으면 바로 실패하고, 일시적인 오류는 백오프 후 다시 시도
+        handle = resilience.call('fal', fal_client.submit, FAL_APPLICATION, arguments=_arguments(_translate_prompt(video.prompt)))
+    except Exception as e:
+        _fail(video, e)
+        return None
+
+    video.fal_request_id = handle.request_id
+    video.fal_status_url = handle.status_url
+    video.fal_response_url = handle.response_url
+    video.fal_cancel_url = handle.cancel_url
+    video.status = TextToVideo.STATUS_PROCESSING
+    video.submitted_at = timezone.now()
+    video.save(update_fields=['fal_request_id', 'fal_status_url', 'fal_response_url', 'fal_cancel_url',
+                              'status', 'submitted_at', 'updated_at'])
+    jobs.update(video.job_id, progress=10)
+    return handle.request_id
+
+
+def _check_status(video):
+    # 상태 조회 하나가 실패해도 다음 주기에 다시 확인하므로 예외를 올리지 않음
+    try:
+        return _handle(video).status(), None
+    except Exception as e:
+        logger.warning("Failed to check status of TextToVideo %s: %s", video.id, e)
+        return None, e
+
+
+@shared_task(ignore_result=True)
+def poll_text_to_video_jobs():
+    # 이전 주기의 조회가 아직 끝나지 않았으면 건너뜀
+    redis_client = get_redis_connection('default')
+    token = uuid.uuid4().hex
+    if not redis_client.set(POLL_LOCK_KEY, token, nx=True, ex=settings.VIDEO_POLL_INTERVAL * 4):
+        return
+    try:
+        _poll_text_to_video_jobs()
+    finally:
+        redis_client.eval(_RELEASE_SCRIPT, 1, POLL_LOCK_KEY, token)
+
+
+def _poll_text_to_video_jobs():
+    now = timezone.now()
+    deadline = now - timedelta(seconds=settings.VIDEO_GENERATION_TIMEOUT)
+    # 업로드 작업이 유실되어 uploading에 멈춘 요청도 실패 처리
+    # (업로드를 예약할 때 갱신한 updated_at부터 시간을 재서 생성이 늦게 끝난 요청의 업로드를 끊지 않음)
+    upload_deadline = now - timedelta(seconds=settings.VIDEO_UPLOAD_TIMEOUT)
+    stalled = TextToVideo.objects.filter(status=TextToVideo.STATUS_UPLOADING, updated_at__lt=upload_deadline)
+    for video in stalled[:settings.VIDEO_POLL_BATCH_SIZE]:
+        _fail(video, "Upload timeout exceeded")
+
+    breaker = resilience.CircuitBreaker('fal')
+    try:
+        breaker.allow()
+    except resilience.CircuitOpenError as e:
+        logger.warning("Skipping text-to-video status polling: %s", e)
+        return
+
+    videos = list(
+        TextToVideo.objects.filter(status=TextToVideo.STATUS_PROCESSING)
+        .order_by('submitted_at')[:settings.VIDEO_POLL_BATCH_SIZE]
+    )
+    if not videos:
+        return
+
+    with ThreadPoolExecutor(max_workers=settings.VIDEO_POLL_CONCURRENCY) as pool:
+        statuses = list(pool.map(_check_status, videos))
+
+    checked = failures = 0
+    for video, (request_status, error) in zip(videos, statuses):
+        if error is not None:
+            failures += resilience.is_transient(error)
+        else:
+            checked += 1
+            if isinstance(request_status, fal_client.Completed):
+                # 상태를 먼저 바꾼 작업만 업로드를 예약해서 중복 업로드를 막음
+                claimed = TextToVideo.objects.filter(id=video.id, status=TextToVideo.STATUS_PROCESSING) \
+                    .update(status=TextToVideo.STATUS_UPLOADING, updated_at=timezone.now())
+                if claimed:
+                    jobs.update(video.job_id, progress=80)
+                    finish_text_to_video_task.delay(video.id)
+                continue
+        if video.submitted_at and video.submitted_at < deadline:
+            _fail(video, "Polling timeout exceeded")
+
+    # 주기마다 한 번만 서킷 상태를 갱신
+    if checked:
+        breaker.record_success()
+    elif failures:
+        breaker.record_failure()
+    logger.info("Polled %d text-to-video requests (%d checked, %d transient failures)", len(videos), checked, failures)
+
+
+@shared_task
+def finish_text_to_video_task(text_to_video_id):
+    """
+    완료된 fal 요청의 결과 비디오를 S3로 스트리밍 업로드하고 완료 처리합니다.
+    (fal에서 실패한 요청은 결과 조회가 오류 응답을 주므로 여기서 실패 처리)
+    """
+    video = TextToVideo.objects.get(id=text_to_video_id)
+    try:
+        result = resilience.call('fal', _handle(video).get)
+        unique_filename = f"{uuid.uuid4()}.mp4"
+        s3_url = storage.upload_from_url(result['video']['url'], unique_filename, 'video/mp4',
+                                         bucket=settings.AWS_STORAGE_BUCKET_NAME_VIDEO,
+                                         extra_args={'ContentDisposition': 'inline'})
+    except Exception as e:
+        _fail(video, e)
+        return None
+
+    video.video_url = s3_url
+    video.status = TextToVideo.STATUS_COMPLETED
+    video.save(update_fields=['video_url', 'status', 'updated_at'])
+    jobs.complete(video.job_id, {'id': video.id, 'video_url': s3_url})
+    return s3_url
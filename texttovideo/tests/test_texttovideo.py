@@ -1,8 +1,13 @@
+from datetime import timedelta
+from unittest import mock
+from django.conf import settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from user.models import User
 from texttovideo.models import TextToVideo
+from texttovideo import tasks
 
 class TextToVideoTests(APITestCase):
 
@@ -19,10 +24,11 @@ class TextToVideoTests(APITestCase):
             'user_id': self.user.id
         }
         response = self.client.post(self.create_url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertIn('id', response.data)
         self.assertIn('prompt', response.data)
-        self.assertIn('video_url', response.data)
+        self.assertEqual(response.data['status'], TextToVideo.STATUS_PENDING)
+        self.assertIn('job_id', response.data)
 
     def test_get_video(self):
         # 비디오 조회 테스트
@@ -45,3 +51,17 @@ class TextToVideoTests(APITestCase):
         with self.assertRaises(TextToVideo.DoesNotExist):
             TextToVideo.objects.get(id=video.id)
 
+    def test_poll_fails_only_stalled_uploads(self):
+        # 업로드 예약 후 제한 시간이 지난 요청만 실패 처리 (생성이 오래 걸렸어도 방금 예약된 업로드는 그대로 둠)
+        submitted_at = timezone.now() - timedelta(seconds=settings.VIDEO_GENERATION_TIMEOUT + 60)
+        stalled, late_generation = [
+            TextToVideo.objects.create(prompt='A rocket', user=self.user, status=TextToVideo.STATUS_UPLOADING,
+                                       submitted_at=submitted_at)
+            for _ in range(2)
+        ]
+        claimed_at = timezone.now() - timedelta(seconds=settings.VIDEO_UPLOAD_TIMEOUT + 60)
+        TextToVideo.objects.filter(id=stalled.id).update(updated_at=claimed_at)
+        with mock.patch('texttovideo.tasks.resilience.CircuitBreaker'):
+            tasks._poll_text_to_video_jobs()
+        self.assertEqual(TextToVideo.objects.get(id=stalled.id).status, TextToVideo.STATUS_FAILED)
+        self.assertEqual(TextToVideo.objects.get(id=late_generation.id).status, TextToVideo.STATUS_UPLOADING)
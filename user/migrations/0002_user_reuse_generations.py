@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='reuse_generations',
+            field=models.BooleanField(default=True),
+        ),
+    ]
@@ -6,3 +6,4 @@ class User(models.Model):
     created_at = models.DateTimeField(auto_now_add=True) # 최초 저장 시에만 현재 날짜
     updated_at = models.DateTimeField(auto_now=True) # 수정이 될 때마다 현재 날짜
     is_deleted = models.BooleanField(default=False)
+    reuse_generations = models.BooleanField(default=True) # 같은 입력의 배경 생성 시 캐시된 결과 재사용 여부
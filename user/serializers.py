@@ -9,6 +9,11 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = '__all__'
 
+class UserSettingsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['reuse_generations']
+
 class NicknameCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
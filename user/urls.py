@@ -7,4 +7,5 @@ app_name = 'user'
 urlpatterns = [
     path('', views.create_nickname, name='create-nickname'),
     path('<int:userId>', get_nickname, name='get-nickname'),
+    path('<int:userId>/settings', views.user_settings, name='user-settings'),
 ]
\ No newline at end of file
@@ -3,7 +3,7 @@ from rest_framework import status, serializers
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from user.models import User
-from user.serializers import NicknameCreateSerializer
+from user.serializers import NicknameCreateSerializer, UserSettingsSerializer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -57,4 +57,36 @@ def create_nickname(request, *args, **kwargs):
 def get_nickname(request, userId):
     user_nickname = User.objects.get(id=userId).nickname
     return Response({"success": "사용자가 성공적으로 조회되었습니다.", "data": { "nickname": user_nickname}},
-                    status=status.HTTP_201_CREATED)
\ No newline at end of file
+                    status=status.HTTP_201_CREATED)
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_id='사용자 설정 조회',
+    operation_description='사용자 설정을 조회합니다.',
+    tags=['Users'],
+    responses={200: UserSettingsSerializer, 404: "User not found."}
+)
+@swagger_auto_schema(
+    method='patch',
+    operation_id='사용자 설정 수정',
+    operation_description='사용자 설정을 수정합니다.\n\nreuse_generations를 false로 설정하면 배경 생성 시 캐시된 결과 대신 항상 새로 생성합니다.',
+    tags=['Users'],
+    request_body=UserSettingsSerializer,
+    responses={200: UserSettingsSerializer, 400: "Bad request.", 404: "User not found."}
+)
+@api_view(['GET', 'PATCH'])
+def user_settings(request, userId):
+    try:
+        user = User.objects.get(id=userId, is_deleted=False)
+    except User.DoesNotExist:
+        return Response({"error": "사용자 없음"}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        return Response(UserSettingsSerializer(user).data, status=status.HTTP_200_OK)
+
+    serializer = UserSettingsSerializer(user, data=request.data, partial=True)
+    if serializer.is_valid():
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -3,9 +3,27 @@ from user.models import User
 from image.models import Image
 
 class Video(models.Model):
+    STATUS_PENDING = 'pending'  # 생성 API에 제출 전
+    STATUS_PROCESSING = 'processing'  # 제출 후 생성 중 (poll_video_jobs가 상태 확인)
+    STATUS_UPLOADING = 'uploading'  # 생성이 끝나 S3로 옮기는 중
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     image = models.ForeignKey(Image, on_delete=models.CASCADE)
     video_url = models.CharField(max_length=500, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_COMPLETED, db_index=True)  # 비동기 생성 진행 상태
+    provider_uuid = models.CharField(max_length=100, blank=True, null=True)  # 비디오 생성 API의 작업 ID
+    job_id = models.CharField(max_length=32, blank=True, null=True)  # core.jobs 진행 상태 ID
+    submitted_at = models.DateTimeField(blank=True, null=True)  # 생성 API에 제출한 시각 (시간 초과 판단용)
+    error = models.TextField(blank=True, null=True)  # 생성 실패 사유
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
@@ -4,5 +4,5 @@ from .models import Video
 class VideoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Video
-        fields = ['id', 'user', 'video_url']
-        read_only_fields = ['id', 'video_url']
+        fields = ['id', 'user', 'video_url', 'status', 'error']
+        read_only_fields = ['id', 'video_url', 'status', 'error']
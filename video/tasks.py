@@ -1,14 +1,18 @@
 import logging
-import boto3
 import requests
+from requests.adapters import HTTPAdapter
 from celery import shared_task
-from botocore.exceptions import NoCredentialsError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from .models import Video
-import io
-import time
-import openai
-import re
+from core import jobs, resilience, storage, translation
+import os
+import threading
+import uuid
 import environ
+from django.conf import settings
+from django.utils import timezone
+from django_redis import get_redis_connection
 
 # 환경 변수 로드
 env = environ.Env()
@@ -17,50 +21,70 @@ environ.Env.read_env()
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-# OpenAI API 키 설정
-openai.api_key = env("OPENAI_API_KEY")
+# 비디오 생성은 세 단계로 나눠서 워커 슬롯을 생성 시간 동안 붙잡지 않음
+# 1. submit_video_task: 생성 API에 제출하고 작업 uuid를 Video에 저장 (processing)
+# 2. poll_video_jobs: beat가 주기적으로 실행해서 processing인 비디오 전체의 상태를 한 번에 동시 조회
+# 3. finish_video_task: 생성이 끝난 비디오만 내려받아 S3에 업로드 (completed)
 
-def is_korean(text):
-    # 간단하게 한국어 문자가 포함되어 있는지 확인
-    return bool(re.search('[\u3131-\u3163\uac00-\ud7a3]', text))
+AIVIDEO_API_URL = 'https://api.aivideoapi.com'
+POLL_LOCK_KEY = 'video_poll_lock'
 
-def translate_text(text, source_language='ko', target_language='en'):
-    try:
-        headers = {
-            'Authorization': f'Bearer {openai.api_key}',  # OpenAI API 키를 헤더에 포함
-            'Content-Type': 'application/json'
-        }
-        data = {
-            "model": "gpt-4",
-            "messages": [
-                {"role": "system", "content": f"Translate the following text from {source_language} to {target_language}."},
-                {"role": "user", "content": text}
-            ],
-            "max_tokens": 100  # 최대 토큰 수를 100으로 설정
-        }
+# 락을 잡은 주기의 토큰일 때만 삭제 (만료 후 다른 주기가 잡은 락을 지우지 않도록)
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # 프로세스마다 하나의 keep-alive 세션으로 상태 조회 연결을 재사용
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.VIDEO_POLL_CONCURRENCY)
+            session.mount('https://', adapter)
+            session.headers['Authorization'] = f'Bearer {env("VIDEO_API_KEY")}'
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def _request(method, url, **kwargs):
+    # 5xx 응답도 예외로 바꿔서 재시도/서킷 브레이커가 제공자 장애로 인식하도록 함
+    response = get_session().request(method, url, timeout=30, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+def _fail(video, error):
+    logger.error("Video %s generation failed: %s", video.id, error)
+    video.status = Video.STATUS_FAILED
+    video.error = str(error)
+    video.save(update_fields=['status', 'error', 'updated_at'])
+    jobs.fail(video.job_id, error)
 
-        response = requests.post('https://api.openai.com/v1/chat/completions', headers=headers, json=data)
-        response.raise_for_status()
-        response_json = response.json()
-        translation = response_json['choices'][0]['message']['content'].strip().strip('\"')
-        return translation
-    except Exception as e:
-        logger.error("Error translating text: %s", e)
-        return text
 
 @shared_task
-def generate_video_task(video_id, image_url, unique_filename, text_prompt):
+def submit_video_task(video_id, image_url, text_prompt, job_id=None):
+    """
+    비디오 생성 API에 작업을 제출하고 uuid를 저장합니다. 결과 확인은 poll_video_jobs가 합니다.
+    """
+    jobs.start(job_id)
+    video = Video.objects.get(id=video_id)
     try:
         # 텍스트가 한국어인지 확인 후 번역
-        if is_korean(text_prompt):
-            translated_prompt = translate_text(text_prompt)
+        if translation.is_korean(text_prompt):
+            translated_prompt = translation.translate(text_prompt)
         else:
             translated_prompt = text_prompt
 
-        video = Video.objects.get(id=video_id)
-        api_key = env("VIDEO_API_KEY")
-        url = "https://api.aivideoapi.com/runway/generate/imageDescription"
-
         payload = {
             "text_prompt": translated_prompt,
             "img_prompt": image_url,
@@ -70,77 +94,121 @@ def generate_video_task(video_id, image_url, unique_filename, text_prompt):
             "interpolate": True,
             "callback_url": ""  # 빈 문자열로 설정
         }
+        # 서킷이 열려 있으면 바로 실패하고, 일시적인 오류는 백오프 후 다시 시도
+        response = resilience.call('aivideoapi', _request, 'POST', f"{AIVIDEO_API_URL}/runway/generate/imageDescription",
+                                   json=payload)
+        provider_uuid = response.json().get('uuid')
+    except Exception as e:
+        _fail(video, e)
+        return None
 
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
+    if not provider_uuid:
+        _fail(video, "No UUID returned by API")
+        return None
 
-        response = requests.post(url, json=payload, headers=headers)
-
-        if response.status_code == 200:
-            uuid = response.json().get('uuid')
-            if uuid:
-                status_url = f"https://api.aivideoapi.com/status?uuid={uuid}"
-                headers = {
-                    "accept": "application/json",
-                    "Authorization": f"Bearer {api_key}"
-                }
-
-                timeout = 30 * 60  # 30 minutes in seconds
-
-                elapsed_time = 0
-                polling_interval = 15  # seconds
-
-                while True:
-                    time.sleep(polling_interval)
-                    elapsed_time += polling_interval
-
-                    if elapsed_time > timeout:
-                        logger.error("Polling timeout exceeded 30 minutes")
-                        return
-
-                    status_response = requests.get(status_url, headers=headers).json()
-                    if status_response['status'] == 'success':
-                        video_url = status_response['url']
-                        break
-                    elif status_response['status'] == 'failed':
-                        logger.error("Video generation failed")
-                        return
-
-                video_response = requests.get(video_url)
-                video_response.raise_for_status()  # Raise an error on bad status
-                video_content = video_response.content
-
-                s3_url = upload_to_s3(video_content, unique_filename, 'video/mp4')
-
-                if s3_url:
-                    video.video_url = s3_url
-                    video.save()
-                else:
-                    logger.error("S3 upload failed")
-            else:
-                logger.error("No UUID returned by API")
-        else:
-            logger.error(f"API request failed: {response.status_code}, {response.content}")
+    video.provider_uuid = provider_uuid
+    video.status = Video.STATUS_PROCESSING
+    video.submitted_at = timezone.now()
+    video.save(update_fields=['provider_uuid', 'status', 'submitted_at', 'updated_at'])
+    jobs.update(job_id, progress=10)
+    return provider_uuid
+
+
+def _check_status(video):
+    # 상태 조회 하나가 실패해도 다음 주기에 다시 확인하므로 예외를 올리지 않음
+    try:
+        response = _request('GET', f"{AIVIDEO_API_URL}/status", params={'uuid': video.provider_uuid},
+                            headers={"accept": "application/json"})
+        return response.json(), None
     except Exception as e:
-        logger.error("Error in generate_video_task: %s", e)
+        logger.warning("Failed to check status of Video %s: %s", video.id, e)
+        return None, e
+
 
+@shared_task(ignore_result=True)
+def poll_video_jobs():
+    # 이전 주기의 조회가 아직 끝나지 않았으면 건너뜀
+    redis_client = get_redis_connection('default')
+    token = uuid.uuid4().hex
+    if not redis_client.set(POLL_LOCK_KEY, token, nx=True, ex=settings.VIDEO_POLL_INTERVAL * 4):
+        return
+    try:
+        _poll_video_jobs()
+    finally:
+        redis_client.eval(_RELEASE_SCRIPT, 1, POLL_LOCK_KEY, token)
+
+
+def _poll_video_jobs():
+    now = timezone.now()
+    deadline = now - timedelta(seconds=settings.VIDEO_GENERATION_TIMEOUT)
+    # 업로드 작업이 유실되어 uploading에 멈춘 비디오도 실패 처리
+    # (업로드를 예약할 때 갱신한 updated_at부터 시간을 재서 생성이 늦게 끝난 비디오의 업로드를 끊지 않음)
+    upload_deadline = now - timedelta(seconds=settings.VIDEO_UPLOAD_TIMEOUT)
+    stalled = Video.objects.filter(status=Video.STATUS_UPLOADING, updated_at__lt=upload_deadline)
+    for video in stalled[:settings.VIDEO_POLL_BATCH_SIZE]:
+        _fail(video, "Upload timeout exceeded")
+
+    breaker = resilience.CircuitBreaker('aivideoapi')
+    try:
+        breaker.allow()
+    except resilience.CircuitOpenError as e:
+        logger.warning("Skipping video status polling: %s", e)
+        return
+
+    videos = list(
+        Video.objects.filter(status=Video.STATUS_PROCESSING)
+        .order_by('submitted_at')[:settings.VIDEO_POLL_BATCH_SIZE]
+    )
+    if not videos:
+        return
+
+    with ThreadPoolExecutor(max_workers=settings.VIDEO_POLL_CONCURRENCY) as pool:
+        statuses = list(pool.map(_check_status, videos))
+
+    checked = failures = 0
+    for video, (status_response, error) in zip(videos, statuses):
+        if error is not None:
+            failures += resilience.is_transient(error)
+        else:
+            checked += 1
+            if status_response.get('status') == 'success':
+                # 상태를 먼저 바꾼 작업만 업로드를 예약해서 중복 업로드를 막음
+                claimed = Video.objects.filter(id=video.id, status=Video.STATUS_PROCESSING) \
+                    .update(status=Video.STATUS_UPLOADING, updated_at=timezone.now())
+                if claimed:
+                    jobs.update(video.job_id, progress=80)
+                    finish_video_task.delay(video.id, status_response['url'])
+                continue
+            if status_response.get('status') == 'failed':
+                _fail(video, "Video generation failed")
+                continue
+        if video.submitted_at and video.submitted_at < deadline:
+            _fail(video, "Polling timeout exceeded")
+
+    # 주기마다 한 번만 서킷 상태를 갱신
+    if checked:
+        breaker.record_success()
+    elif failures:
+        breaker.record_failure()
+    logger.info("Polled %d videos (%d checked, %d transient failures)", len(videos), checked, failures)
 
-def upload_to_s3(file_content, file_name, content_type):
-    s3 = boto3.client('s3',
-                      aws_access_key_id=env("AWS_ACCESS_KEY_ID"),
-                      aws_secret_access_key=env("AWS_SECRET_ACCESS_KEY"),
-                      region_name=env("AWS_S3_REGION_NAME"))
 
+@shared_task
+def finish_video_task(video_id, video_url):
+    """
+    생성이 끝난 비디오를 내려받아 S3에 업로드하고 완료 처리합니다.
+    """
+    video = Video.objects.get(id=video_id)
     try:
-        s3.upload_fileobj(io.BytesIO(file_content), env("AWS_STORAGE_BUCKET_NAME_VIDEO"), file_name,
-                          ExtraArgs={'ContentType': content_type})
-        s3_url = f"https://{env('AWS_STORAGE_BUCKET_NAME_VIDEO')}.s3.{env('AWS_S3_REGION_NAME')}.amazonaws.com/{file_name}"
-        return s3_url
-    except NoCredentialsError:
-        logger.error("Credentials not available")
-        return None
+        # 응답 본문을 메모리에 모두 받지 않고 S3 멀티파트 업로드로 바로 전송
+        s3_url = storage.upload_from_url(video_url, f"{uuid.uuid4()}.mp4", 'video/mp4',
+                                         bucket=settings.AWS_STORAGE_BUCKET_NAME_VIDEO)
     except Exception as e:
-        logger.error("Error uploading to S3: %s", e)
-        return None
\ No newline at end of file
+        _fail(video, e)
+        return None
+
+    video.video_url = s3_url
+    video.status = Video.STATUS_COMPLETED
+    video.save(update_fields=['video_url', 'status', 'updated_at'])
+    jobs.complete(video.job_id, {'video_id': video.id, 'video_url': s3_url})
+    return s3_url
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from unittest import mock
+import pytest
+from django.conf import settings
+from django.utils import timezone
+from user.models import User
+from image.models import Image
+from .models import Video
+from . import tasks
+
+
+@pytest.mark.django_db
+def test_poll_dispatches_only_finished_videos(): #생성이 끝난 비디오만 업로드를 예약하고 실패한 비디오는 실패 처리
+    user = User.objects.create(nickname='testuser')
+    image = Image.objects.create(user=user, image_url='http://testserver/media/test_image.jpg')
+    finished, running, failed = [
+        Video.objects.create(user=user, image=image, status=Video.STATUS_PROCESSING, provider_uuid=name)
+        for name in ('finished', 'running', 'failed')
+    ]
+    statuses = {
+        'finished': ({'status': 'success', 'url': 'http://provider/video.mp4'}, None),
+        'running': ({'status': 'processing'}, None),
+        'failed': ({'status': 'failed'}, None),
+    }
+    with mock.patch('video.tasks._check_status', side_effect=lambda video: statuses[video.provider_uuid]), \
+            mock.patch('video.tasks.resilience.CircuitBreaker'), \
+            mock.patch('video.tasks.finish_video_task') as finish_video_task:
+        tasks._poll_video_jobs()
+    finish_video_task.delay.assert_called_once_with(finished.id, 'http://provider/video.mp4')
+    assert Video.objects.get(id=finished.id).status == Video.STATUS_UPLOADING
+    assert Video.objects.get(id=running.id).status == Video.STATUS_PROCESSING
+    assert Video.objects.get(id=failed.id).status == Video.STATUS_FAILED
+
+
+@pytest.mark.django_db
+def test_poll_fails_stalled_uploads(): #업로드 예약 후 제한 시간이 지나도 uploading에 멈춘 비디오만 실패 처리
+    user = User.objects.create(nickname='testuser')
+    image = Image.objects.create(user=user, image_url='http://testserver/media/test_image.jpg')
+    submitted_at = timezone.now() - timedelta(seconds=settings.VIDEO_GENERATION_TIMEOUT + 60)
+    stalled, late_generation = [
+        Video.objects.create(user=user, image=image, status=Video.STATUS_UPLOADING, submitted_at=submitted_at)
+        for _ in range(2)
+    ]
+    # 생성은 오래 걸렸지만 업로드는 방금 예약된 비디오는 그대로 둠
+    claimed_at = timezone.now() - timedelta(seconds=settings.VIDEO_UPLOAD_TIMEOUT + 60)
+    Video.objects.filter(id=stalled.id).update(updated_at=claimed_at)
+    with mock.patch('video.tasks.resilience.CircuitBreaker'):
+        tasks._poll_video_jobs()
+    assert Video.objects.get(id=stalled.id).status == Video.STATUS_FAILED
+    assert Video.objects.get(id=late_generation.id).status == Video.STATUS_UPLOADING
+
+
+def test_poll_releases_only_own_lock(): #락은 자신이 잡은 토큰일 때만 해제
+    redis_client = mock.Mock()
+    redis_client.set.return_value = True
+    with mock.patch('video.tasks.get_redis_connection', return_value=redis_client), \
+            mock.patch('video.tasks._poll_video_jobs'):
+        tasks.poll_video_jobs()
+    token = redis_client.set.call_args[0][1]
+    redis_client.eval.assert_called_once_with(tasks._RELEASE_SCRIPT, 1, tasks.POLL_LOCK_KEY, token)
+    redis_client.delete.assert_not_called()
@@ -6,9 +6,9 @@ from drf_yasg import openapi
 from .models import Video
 from .serializers import VideoSerializer
 from background.models import Background
-from .tasks import generate_video_task
-import uuid
+from .tasks import submit_video_task
 from image.models import Image
+from core import jobs
 
 @swagger_auto_schema(
     method='post',
@@ -23,7 +23,8 @@ from image.models import Image
     responses={201: openapi.Response('Created', openapi.Schema(
         type=openapi.TYPE_OBJECT,
         properties={
-            'video_id': openapi.Schema(type=openapi.TYPE_INTEGER)
+            'video_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+            'job_id': openapi.Schema(type=openapi.TYPE_STRING, description='비디오 생성 진행 상태 조회용 작업 ID')
         }
     ))}
 )
@@ -41,11 +42,13 @@ def videos_create(request):
     except Image.DoesNotExist:
         return Response({"error": "Image not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    video = Video.objects.create(user_id=user_id, image=image)
-    unique_filename = f"{uuid.uuid4()}.mp4"
-    generate_video_task.delay(video.id, image.image_url, unique_filename, text_prompt)
+    video = Video.objects.create(user_id=user_id, image=image, status=Video.STATUS_PENDING)
+    # 생성 API 제출 후 결과 확인은 poll_video_jobs가 주기적으로 모아서 처리
+    video.job_id = jobs.create('video_generation', video_id=video.id)
+    video.save(update_fields=['job_id'])
+    submit_video_task.delay(video.id, image.image_url, text_prompt, job_id=video.job_id)
 
-    return Response({'video_id': video.id}, status=status.HTTP_201_CREATED)
+    return Response({'video_id': video.id, 'job_id': video.job_id}, status=status.HTTP_201_CREATED)
 
 
 @swagger_auto_schema(